@@ -1,13 +1,43 @@
-
-from typing import Dict, Any, Tuple
-from .models import Action
 import json
 import logging
+import unicodedata
+from typing import Any
+
+from app.config import settings
 from app.integrations.base import list_integrations
 from app.llm import client as llm_client
+from app.observability.metrics import (
+    parse_cache_hits_total,
+    parse_cache_misses_total,
+    parse_coalesced_total,
+    parser_fallbacks_total,
+)
+from app.observability.tracing import set_attributes, traced
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
+
+from .models import Action
 
 logger = logging.getLogger(__name__)
 
+# Cache of successful LLM parses, keyed by (normalized text, integrations)
+_parse_cache = TTLCache(
+    maxsize=settings.LLM_PARSE_CACHE_SIZE,
+    ttl=settings.LLM_PARSE_CACHE_TTL_SECONDS,
+)
+
+# Concurrent identical parses share one in-flight LLM call
+_inflight_parses = SingleFlight()
+
+
+def _normalize_instruction(text: str) -> str:
+    """
+    Normalize instruction text for cache lookups.
+    Applies Unicode NFKC and collapses whitespace; case is preserved because
+    parameter values (messages, names) are case-sensitive.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
 
 def parse_human(text: str) -> Action:
     """
@@ -18,7 +48,7 @@ def parse_human(text: str) -> Action:
     if "." not in head:
         raise ValueError("Expected 'integration.operation' at start")
     integration, operation = head.split(".", 1)
-    params: Dict[str, Any] = {}
+    params: dict[str, Any] = {}
     for token in rest:
         if "=" in token:
             k, v = token.split("=", 1)
@@ -26,38 +56,68 @@ def parse_human(text: str) -> Action:
     return Action(integration=integration, operation=operation, params=params)
 
 
-async def parse_with_llm(text: str) -> Tuple[Action, str]:
+@traced("parse_with_llm")
+async def parse_with_llm(text: str) -> tuple[Action, str]:
     """
     Parse action using LLM with fallback to rule parser.
     Returns (Action, parser_type) where parser_type is "llm" or "fallback".
+    Successful LLM parses are cached; fallbacks are not. Concurrent calls
+    with the same normalized text are coalesced into a single LLM call.
     """
+    integrations = tuple(list_integrations())
+    cache_key = (_normalize_instruction(text), integrations)
+    cached = _parse_cache.get(cache_key)
+    if cached is not None:
+        parse_cache_hits_total.labels(service="clankerbot").inc()
+        set_attributes(**{"parse.cache_hit": True, "parse.parser": "llm"})
+        return cached.model_copy(deep=True), "llm"
+    parse_cache_misses_total.labels(service="clankerbot").inc()
+
+    if cache_key in _inflight_parses:
+        parse_coalesced_total.labels(service="clankerbot").inc()
+    action, parser_type = await _inflight_parses.do(
+        cache_key, lambda: _parse_with_llm_uncached(text, integrations, cache_key)
+    )
+    set_attributes(**{"parse.cache_hit": False, "parse.parser": parser_type})
+    # The result may be shared with other callers; hand out independent copies
+    return action.model_copy(deep=True), parser_type
+
+
+async def _parse_with_llm_uncached(
+    text: str, integrations: tuple[str, ...], cache_key: tuple[str, tuple[str, ...]]
+) -> tuple[Action, str]:
+    """Call the LLM (falling back to the rule parser) and cache successful results."""
     try:
         # Ask LLM to extract JSON with integration, operation, params.
-        choices = ", ".join(list_integrations()) or "slack"
+        choices = ", ".join(integrations) or "slack"
         sys = (
             "You turn a user instruction into a JSON action for an automation hub. "
             f"Allowed integrations: {choices}. "
             "Output JSON only with keys: integration, operation, params. No prose."
         )
         user = f"Instruction: {text}"
-        resp = await llm_client.chat([
-            {"role": "system", "content": sys},
-            {"role": "user", "content": user},
-        ], temperature=0)
+        resp = await llm_client.chat(
+            [
+                {"role": "system", "content": sys},
+                {"role": "user", "content": user},
+            ],
+            temperature=0,
+        )
         content = resp["choices"][0]["message"]["content"]
 
         # Try to locate and parse JSON
         start = content.find("{")
         end = content.rfind("}")
         if start >= 0 and end > start:
-            obj = json.loads(content[start:end+1])
+            obj = json.loads(content[start : end + 1])
             # Validate required fields
             if "integration" in obj and "operation" in obj:
                 action = Action(
                     integration=obj["integration"],
                     operation=obj["operation"],
-                    params=obj.get("params", {})
+                    params=obj.get("params", {}),
                 )
+                _parse_cache.set(cache_key, action.model_copy(deep=True))
                 return action, "llm"
 
         raise ValueError("LLM response missing required fields")
@@ -65,6 +125,7 @@ async def parse_with_llm(text: str) -> Tuple[Action, str]:
     except Exception as e:
         # Fallback to rule parser
         logger.warning(f"LLM parsing failed: {e}, falling back to rule parser")
+        parser_fallbacks_total.labels(service="clankerbot").inc()
         try:
             action = parse_human(text)
             return action, "fallback"
@@ -1,7 +1,18 @@
-
 from __future__ import annotations
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+
+class RateLimitPolicy(BaseModel):
+    """Per-route rate limit override, keyed by route template in Settings."""
+
+    capacity: int | None = None  # requests per minute (default: RATE_LIMIT_PER_MINUTE)
+    burst: int | None = None  # default: capacity
+    cost: int = 1  # tokens consumed per request
+    exempt: bool = False
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_prefix="", extra="ignore")
 
@@ -10,6 +21,12 @@ class Settings(BaseSettings):
     LLM_BASE_URL: str = "https://api.deepseek.com"
     LLM_MODEL: str = "deepseek-chat"
     DEEPSEEK_API_KEY: str | None = None  # do not commit
+    LLM_POOL_MAX_CONNECTIONS: int = 20
+    LLM_POOL_MAX_KEEPALIVE: int = 10
+    LLM_POOL_KEEPALIVE_EXPIRY: float = 60.0  # seconds
+    LLM_HTTP2: bool = False  # requires the optional `h2` package
+    LLM_PARSE_CACHE_SIZE: int = 1024  # 0 disables the parse result cache
+    LLM_PARSE_CACHE_TTL_SECONDS: float = 300.0
 
     # Server
     CORS_ORIGINS: str = "http://localhost:3000"
@@ -17,17 +34,55 @@ class Settings(BaseSettings):
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_BURST: int = 30
+    RATE_LIMIT_MAX_BUCKETS: int = 100000  # LRU cap on tracked (client, path) buckets
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per process) or "sqlite" (per host)
+    RATE_LIMIT_SQLITE_PATH: str = "/tmp/clankerbot-ratelimit.sqlite3"
+    RATE_LIMIT_EXEMPT_PATHS: str = "/healthz,/readyz,/metrics"  # route templates
+    # JSON object: route template (optionally "?param=value") -> RateLimitPolicy
+    RATE_LIMIT_ROUTE_POLICIES: dict[str, RateLimitPolicy] = {
+        "/actions/parse?llm=true": RateLimitPolicy(cost=5),
+    }
 
     # Request limits
     MAX_REQUEST_SIZE_MB: int = 1
 
+    # Batch execution (/actions/run/batch)
+    BATCH_MAX_ACTIONS: int = 500
+    BATCH_MAX_CONCURRENCY: int = 10
+    BATCH_INTEGRATION_CONCURRENCY: str = ""  # e.g. "clockify=5,slack=2"
+
     # Webhook security
     WEBHOOK_SHARED_SECRET: str | None = None
     WEBHOOK_IP_ALLOWLIST: str = ""  # CIDR list comma-separated
 
+    # Webhook idempotency (duplicate event suppression)
+    IDEMPOTENCY_BACKEND: str = "memory"  # "memory" (per process) or "sqlite" (per host)
+    IDEMPOTENCY_CAPACITY: int = 10000
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_SQLITE_PATH: str = "/tmp/clankerbot-idempotency.sqlite3"
+
+    # Webhook ingestion queue
+    WEBHOOK_QUEUE_SIZE: int = 1000
+    WEBHOOK_WORKERS: int = 4  # 0 processes events inline
+    WEBHOOK_QUEUE_RETRY_AFTER_SECONDS: int = 5
+    WEBHOOK_QUEUE_DRAIN_SECONDS: float = 10.0
+
     # Observability
     LOG_JSON: bool = False
+    JSON_BACKEND: str = "auto"  # auto (orjson if installed), orjson, json
+    LOG_QUEUE: bool = False  # write logs from a background thread
+    LOG_QUEUE_SIZE: int = 10000  # buffered records before new ones are dropped
+    LOG_SAMPLE_RATE: float = 1.0  # fraction of successful requests logged
+    LOG_SLOW_REQUEST_MS: float = 1000.0  # slower requests are always logged
+    LOG_SKIP_PATHS: str = "/healthz,/readyz,/metrics"  # successes never logged
     OTEL_EXPORTER_OTLP_ENDPOINT: str | None = None
+    TRACING_ENABLED: bool = False  # requires opentelemetry-sdk
+    # otlp, console or file (default: otlp if endpoint set, else console)
+    TRACING_EXPORTER: str = ""
+    TRACING_FILE_PATH: str = "/tmp/clankerbot-traces.jsonl"
+    TRACING_SAMPLE_RATE: float = 1.0  # fraction of new traces recorded
+    ADMIN_TOKEN: str | None = None  # enables /admin/profile when set
+    PROFILE_MAX_SECONDS: float = 60.0
     METRICS_ENABLED: bool = False
 
     # Adapters
@@ -37,5 +92,15 @@ class Settings(BaseSettings):
     CLOCKIFY_API_KEY: str | None = None
     CLOCKIFY_ADDON_TOKEN: str | None = None
     CLOCKIFY_BASE_URL: str = "https://api.clockify.me/api"
+    CLOCKIFY_POOL_MAX_CONNECTIONS: int = 100
+    CLOCKIFY_POOL_MAX_KEEPALIVE: int = 20
+    CLOCKIFY_POOL_KEEPALIVE_EXPIRY: float = 30.0  # seconds
+    CLOCKIFY_HTTP2: bool = False  # requires the optional `h2` package
+    CLOCKIFY_PAGE_SIZE: int = 200  # items per page when listing projects/clients
+    CLOCKIFY_METADATA_CACHE_TTL_SECONDS: float = 300.0  # 0 disables
+    CLOCKIFY_METADATA_CACHE_SIZE: int = 1024
+    CLOCKIFY_RATE_LIMIT_PER_SECOND: float = 50.0  # per API key/token, 0 disables
+    CLOCKIFY_RATE_LIMIT_BURST: int = 50
+
 
 settings = Settings()
@@ -0,0 +1,146 @@
+"""
+Idempotency stores for webhook event IDs.
+
+The in-memory store is per process. The SQLite store keeps event IDs in a
+local database file so every uvicorn worker (or pod container) on the same
+node shares duplicate suppression.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.sqlite import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyStore(ABC):
+    """Records event IDs and reports whether one was already seen."""
+
+    @abstractmethod
+    async def check_and_record(self, event_id: str) -> bool:
+        """
+        Check if event has been seen before and record it.
+        Returns True if duplicate, False if new.
+        """
+
+    @abstractmethod
+    async def discard(self, event_id: str) -> None:
+        """Forget an event ID so a redelivery is treated as new."""
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Process-local store: bounded, with entries expiring after ttl seconds."""
+
+    def __init__(
+        self,
+        capacity: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._seen = TTLCache(maxsize=capacity, ttl=ttl, clock=clock)
+
+    async def check_and_record(self, event_id: str) -> bool:
+        if event_id in self._seen:
+            return True
+        self._seen.set(event_id, True)
+        return False
+
+    async def discard(self, event_id: str) -> None:
+        self._seen.pop(event_id)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """
+    Store backed by a SQLite file, shareable between processes on one host.
+    Queries run in a worker thread so the event loop is never blocked on I/O.
+    """
+
+    # Prune expired/overflow rows every N inserts rather than on each one
+    PRUNE_EVERY = 100
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int,
+        ttl: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.capacity = capacity
+        self.ttl = ttl
+        self._clock = clock
+        self._db = SQLiteDatabase(path)
+        with self._db.transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS webhook_events "
+                "(event_id TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS webhook_events_expires_at "
+                "ON webhook_events (expires_at)"
+            )
+
+    def _check_and_record(self, event_id: str) -> bool:
+        now = self._clock()
+        with self._db.transaction() as conn:
+            conn.execute(
+                "DELETE FROM webhook_events WHERE event_id = ? AND expires_at <= ?",
+                (event_id, now),
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO webhook_events (event_id, expires_at) VALUES (?, ?)",
+                (event_id, now + self.ttl),
+            )
+            is_new = cursor.rowcount == 1
+            if is_new and self._db.count_write(self.PRUNE_EVERY):
+                self._prune(conn, now)
+        return not is_new
+
+    def _prune(self, conn, now: float) -> None:
+        """Delete expired rows, then the oldest rows beyond capacity."""
+        conn.execute("DELETE FROM webhook_events WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM webhook_events WHERE event_id IN ("
+            "SELECT event_id FROM webhook_events ORDER BY expires_at DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.capacity,),
+        )
+
+    def _discard(self, event_id: str) -> None:
+        self._db.execute("DELETE FROM webhook_events WHERE event_id = ?", (event_id,))
+
+    async def check_and_record(self, event_id: str) -> bool:
+        return await self._db.run(self._check_and_record, event_id)
+
+    async def discard(self, event_id: str) -> None:
+        await self._db.run(self._discard, event_id)
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def create_idempotency_store() -> IdempotencyStore:
+    """Create the idempotency store selected by IDEMPOTENCY_BACKEND."""
+    backend = settings.IDEMPOTENCY_BACKEND.lower()
+    if backend == "sqlite":
+        return SQLiteIdempotencyStore(
+            settings.IDEMPOTENCY_SQLITE_PATH,
+            capacity=settings.IDEMPOTENCY_CAPACITY,
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        )
+    if backend != "memory":
+        logger.warning(f"Unknown IDEMPOTENCY_BACKEND {backend!r}, using memory")
+    return MemoryIdempotencyStore(
+        capacity=settings.IDEMPOTENCY_CAPACITY,
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    )
@@ -1,28 +1,38 @@
-
 from __future__ import annotations
-from typing import Dict, Any
+
 from abc import ABC, abstractmethod
+from typing import Any
+
+_registry: dict[str, Integration] = {}
 
-_registry: dict[str, 'Integration'] = {}
 
 def register_integration(name: str):
     def deco(cls):
         _registry[name] = cls()
         return cls
+
     return deco
 
-def get_integration(name: str) -> 'Integration':
+
+def get_integration(name: str) -> Integration:
     if name not in _registry:
         raise ValueError(f"Unknown integration: {name}")
     return _registry[name]
 
+
 def list_integrations() -> list[str]:
     return sorted(_registry.keys())
 
+
 class Integration(ABC):
     @abstractmethod
-    async def execute(self, operation: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        ...
+    async def execute(self, operation: str, params: dict[str, Any]) -> dict[str, Any]: ...
 
-    async def handle_webhook(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_webhook(self, payload: dict[str, Any]) -> dict[str, Any]:
         return {"received": True, "payload": payload}
+
+    async def startup(self) -> None:
+        """Acquire long-lived resources (e.g. HTTP connection pools) on app startup."""
+
+    async def aclose(self) -> None:
+        """Release resources acquired in startup() on app shutdown."""
@@ -1,14 +1,24 @@
-
 from __future__ import annotations
-from typing import Dict, Any
+
 import logging
+from typing import Any
+
 from app.integrations.base import Integration, register_integration
-from app.integrations.clockify_client import ClockifyClient, ClockifyAPIError
-from app.integrations.clockify_types import ClientCreate, TimeEntryCreate, ProjectCreate
+from app.integrations.clockify_client import ClockifyAPIError, ClockifyClient
+from app.integrations.clockify_types import ClientCreate, ProjectCreate, TimeEntryCreate
 
 logger = logging.getLogger(__name__)
 
 
+def _page_size(params: dict[str, Any]) -> int | None:
+    """Read an optional positive pageSize param for list operations."""
+    try:
+        page_size = int(params.get("pageSize") or 0)
+    except (TypeError, ValueError):
+        return None
+    return page_size if page_size > 0 else None
+
+
 @register_integration("clockify")
 class ClockifyIntegration(Integration):
     """
@@ -23,7 +33,17 @@ class ClockifyIntegration(Integration):
             logger.warning(f"Clockify client initialization failed: {e}")
             self.client = None
 
-    async def execute(self, operation: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def startup(self) -> None:
+        """Open the pooled HTTP client so the first request skips connection setup."""
+        if self.client:
+            self.client.open()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self.client:
+            await self.client.aclose()
+
+    async def execute(self, operation: str, params: dict[str, Any]) -> dict[str, Any]:
         """Execute Clockify operation with error mapping."""
         if not self.client:
             return {
@@ -81,7 +101,7 @@ class ClockifyIntegration(Integration):
                             "message": "workspaceId required",
                         },
                     }
-                clients = await self.client.list_clients(workspace_id)
+                clients = await self.client.list_clients(workspace_id, page_size=_page_size(params))
                 return {"ok": True, "clients": [c.model_dump() for c in clients]}
 
             if operation == "list_projects":
@@ -94,7 +114,9 @@ class ClockifyIntegration(Integration):
                             "message": "workspaceId required",
                         },
                     }
-                projects = await self.client.list_projects(workspace_id)
+                projects = await self.client.list_projects(
+                    workspace_id, page_size=_page_size(params)
+                )
                 return {"ok": True, "projects": [p.model_dump() for p in projects]}
 
             if operation == "create_project":
@@ -154,7 +176,7 @@ class ClockifyIntegration(Integration):
                 },
             }
 
-    async def handle_webhook(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_webhook(self, payload: dict[str, Any]) -> dict[str, Any]:
         """
         Handle Clockify webhook (legacy endpoint).
         Use the dedicated /webhooks/clockify router for production.
@@ -162,9 +184,7 @@ class ClockifyIntegration(Integration):
         event_type = payload.get("event") or payload.get("type")
         # Normalize common samples
         if "NEW_TIME_ENTRY" in str(event_type) or (
-            "timeInterval" in payload
-            and "userId" in payload
-            and "projectId" in payload
+            "timeInterval" in payload and "userId" in payload and "projectId" in payload
         ):
             return {
                 "ok": True,
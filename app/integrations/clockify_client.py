@@ -1,28 +1,76 @@
 """
 Async Clockify API client with retry logic and error mapping.
 """
-import logging
+
 import asyncio
-from typing import Dict, Any, List, Optional
+import logging
+import time
+from collections.abc import AsyncIterator
+from email.utils import parsedate_to_datetime
+from typing import Any
+
 import httpx
-from app.utils.http import create_http_client
+
+from app.config import settings
 from app.integrations.clockify_types import (
-    ClockifyUser,
-    ClockifyWorkspace,
-    ClockifyClient as ClockifyClientModel,
     ClientCreate,
-    TimeEntryCreate,
-    ClockifyTimeEntry,
     ClockifyProject,
+    ClockifyTimeEntry,
+    ClockifyUser,
+    ClockifyWorkspace,
     ProjectCreate,
+    TimeEntryCreate,
 )
-from app.config import settings
+from app.integrations.clockify_types import (
+    ClockifyClient as ClockifyClientModel,
+)
+from app.observability.outbound import record_retry
+from app.utils.cache import TTLCache
+from app.utils.http import PooledClient, create_http_client
+from app.utils.singleflight import SingleFlight
+from app.utils.throttle import OutboundThrottle
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on how long a single Retry-After header can pause requests
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+# Outbound throttles shared by every client using the same credential
+_throttles: dict[str, OutboundThrottle] = {}
+
+
+def _get_throttle(credential: str) -> OutboundThrottle | None:
+    """Get the shared outbound throttle for an API key or addon token."""
+    if settings.CLOCKIFY_RATE_LIMIT_PER_SECOND <= 0:
+        return None
+    throttle = _throttles.get(credential)
+    if throttle is None:
+        throttle = OutboundThrottle(
+            settings.CLOCKIFY_RATE_LIMIT_PER_SECOND,
+            settings.CLOCKIFY_RATE_LIMIT_BURST,
+        )
+        _throttles[credential] = throttle
+    return throttle
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP date), capped."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
 
 class ClockifyAPIError(Exception):
     """Base exception for Clockify API errors."""
+
     def __init__(self, code: str, message: str, status_code: int = 500):
         self.code = code
         self.message = message
@@ -35,22 +83,111 @@ class ClockifyClient:
 
     def __init__(
         self,
-        api_key: Optional[str] = None,
-        addon_token: Optional[str] = None,
-        base_url: Optional[str] = None,
+        api_key: str | None = None,
+        addon_token: str | None = None,
+        base_url: str | None = None,
         timeout: float = 20.0,
         max_retries: int = 3,
+        limits: httpx.Limits | None = None,
+        http2: bool | None = None,
     ):
         self.base_url = (base_url or settings.CLOCKIFY_BASE_URL).rstrip("/")
         self.api_key = api_key or settings.CLOCKIFY_API_KEY
         self.addon_token = addon_token or settings.CLOCKIFY_ADDON_TOKEN
         self.timeout = timeout
         self.max_retries = max_retries
+        self.limits = limits or httpx.Limits(
+            max_connections=settings.CLOCKIFY_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.CLOCKIFY_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.CLOCKIFY_POOL_KEEPALIVE_EXPIRY,
+        )
+        self.http2 = settings.CLOCKIFY_HTTP2 if http2 is None else http2
+        self._pool = PooledClient(
+            lambda: create_http_client(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                upstream="clockify",
+            )
+        )
+
+        # Read-through cache for rarely changing workspace/project/client data
+        self._metadata_cache = TTLCache(
+            maxsize=(
+                settings.CLOCKIFY_METADATA_CACHE_SIZE
+                if settings.CLOCKIFY_METADATA_CACHE_TTL_SECONDS > 0
+                else 0
+            ),
+            ttl=settings.CLOCKIFY_METADATA_CACHE_TTL_SECONDS,
+        )
+        self._metadata_loads = SingleFlight()
+        self._metadata_generation = 0
 
         if not self.api_key and not self.addon_token:
             raise ValueError("Either CLOCKIFY_API_KEY or CLOCKIFY_ADDON_TOKEN must be set")
 
-    def _auth_headers(self) -> Dict[str, str]:
+        self._throttle = _get_throttle(self.api_key or self.addon_token)
+
+    def open(self) -> httpx.AsyncClient:
+        """
+        Return the shared pooled HTTP client, creating it on first use.
+        Connections are kept alive and reused across requests and retries.
+        """
+        return self._pool.open()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release its connections."""
+        await self._pool.aclose()
+
+    async def __aenter__(self) -> "ClockifyClient":
+        self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _cached(self, key: tuple, load):
+        """Return the cached value for key, loading it once on a miss."""
+        value = self._metadata_cache.get(key)
+        if value is not None:
+            return value
+
+        async def load_and_store():
+            generation = self._metadata_generation
+            result = await load()
+            # Don't store data that was invalidated while it was loading
+            if generation == self._metadata_generation:
+                self._metadata_cache.set(key, result)
+            return result
+
+        return await self._metadata_loads.do(key, load_and_store)
+
+    def invalidate_metadata(self, workspace_id: str, kind: str | None = None) -> None:
+        """
+        Drop cached metadata for a workspace.
+
+        Args:
+            workspace_id: Workspace whose cached data is stale
+            kind: "workspace", "projects" or "clients"; all kinds if None
+        """
+        self._metadata_generation += 1
+        kinds = (kind,) if kind else ("workspace", "projects", "clients")
+        for k in kinds:
+            self._metadata_cache.pop((k, workspace_id))
+
+    def _retry_delay(self, attempt: int, response: httpx.Response) -> float:
+        """Backoff delay for a retriable response, honouring Retry-After."""
+        delay = (2**attempt) * 0.5
+        retry_after = _retry_after_seconds(response)
+        if retry_after is None:
+            return delay
+        if self._throttle is not None:
+            # Pause every caller sharing this key; acquire() waits out the rest
+            self._throttle.block_for(retry_after)
+            return delay
+        return max(delay, retry_after)
+
+    def _auth_headers(self) -> dict[str, str]:
         """Get authentication headers."""
         if self.api_key:
             return {"X-Api-Key": self.api_key}
@@ -62,8 +199,8 @@ class ClockifyClient:
         self,
         method: str,
         path: str,
-        params: Optional[Dict[str, Any]] = None,
-        json_body: Optional[Any] = None,
+        params: dict[str, Any] | None = None,
+        json_body: Any | None = None,
     ) -> Any:
         """
         Make HTTP request with retry logic.
@@ -73,101 +210,108 @@ class ClockifyClient:
         headers = self._auth_headers()
         headers["Content-Type"] = "application/json"
 
+        client = self.open()
+        url_path = httpx.URL(url).path
         last_exception = None
         for attempt in range(self.max_retries):
             try:
-                async with create_http_client(timeout=self.timeout) as client:
-                    response = await client.request(
-                        method.upper(),
-                        url,
-                        headers=headers,
-                        params=params,
-                        json=json_body,
+                if self._throttle is not None:
+                    waited = await self._throttle.acquire()
+                    if waited > 0.1:
+                        logger.debug(f"Clockify request throttled for {waited:.2f}s")
+                response = await client.request(
+                    method.upper(),
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=json_body,
+                )
+
+                # Retry on 429 (rate limit) or 5xx
+                if response.status_code == 429:
+                    delay = self._retry_delay(attempt, response)
+                    logger.warning(
+                        f"Clockify rate limit hit, retrying in {delay}s (attempt {attempt + 1}/{self.max_retries})"
+                    )
+                    if attempt < self.max_retries - 1:
+                        record_retry("clockify", method, url_path, str(response.status_code))
+                        await asyncio.sleep(delay)
+                        continue
+                    raise ClockifyAPIError(
+                        "rate_limited",
+                        "Clockify API rate limit exceeded",
+                        429,
+                    )
+
+                if response.status_code >= 500:
+                    delay = self._retry_delay(attempt, response)
+                    logger.warning(
+                        f"Clockify server error {response.status_code}, retrying in {delay}s"
+                    )
+                    if attempt < self.max_retries - 1:
+                        record_retry("clockify", method, url_path, str(response.status_code))
+                        await asyncio.sleep(delay)
+                        continue
+                    raise ClockifyAPIError(
+                        "upstream_error",
+                        f"Clockify server error: {response.status_code}",
+                        response.status_code,
+                    )
+
+                # Handle errors
+                if response.status_code == 401:
+                    raise ClockifyAPIError(
+                        "unauthorized",
+                        "Invalid Clockify API key or token",
+                        401,
+                    )
+
+                if response.status_code == 403:
+                    raise ClockifyAPIError(
+                        "forbidden",
+                        "Insufficient permissions for this operation",
+                        403,
+                    )
+
+                if response.status_code == 400:
+                    try:
+                        error_data = response.json()
+                    except Exception:
+                        error_data = {"message": response.text}
+                    raise ClockifyAPIError(
+                        "validation_error",
+                        f"Bad request: {error_data.get('message', 'Unknown error')}",
+                        400,
+                    )
+
+                if response.status_code == 404:
+                    raise ClockifyAPIError(
+                        "not_found",
+                        "Resource not found",
+                        404,
                     )
 
-                    # Retry on 429 (rate limit) or 5xx
-                    if response.status_code == 429:
-                        delay = (2 ** attempt) * 0.5
-                        logger.warning(
-                            f"Clockify rate limit hit, retrying in {delay}s (attempt {attempt + 1}/{self.max_retries})"
-                        )
-                        if attempt < self.max_retries - 1:
-                            await asyncio.sleep(delay)
-                            continue
-                        raise ClockifyAPIError(
-                            "rate_limited",
-                            "Clockify API rate limit exceeded",
-                            429,
-                        )
-
-                    if response.status_code >= 500:
-                        delay = (2 ** attempt) * 0.5
-                        logger.warning(
-                            f"Clockify server error {response.status_code}, retrying in {delay}s"
-                        )
-                        if attempt < self.max_retries - 1:
-                            await asyncio.sleep(delay)
-                            continue
-                        raise ClockifyAPIError(
-                            "upstream_error",
-                            f"Clockify server error: {response.status_code}",
-                            response.status_code,
-                        )
-
-                    # Handle errors
-                    if response.status_code == 401:
-                        raise ClockifyAPIError(
-                            "unauthorized",
-                            "Invalid Clockify API key or token",
-                            401,
-                        )
-
-                    if response.status_code == 403:
-                        raise ClockifyAPIError(
-                            "forbidden",
-                            "Insufficient permissions for this operation",
-                            403,
-                        )
-
-                    if response.status_code == 400:
-                        try:
-                            error_data = response.json()
-                        except Exception:
-                            error_data = {"message": response.text}
-                        raise ClockifyAPIError(
-                            "validation_error",
-                            f"Bad request: {error_data.get('message', 'Unknown error')}",
-                            400,
-                        )
-
-                    if response.status_code == 404:
-                        raise ClockifyAPIError(
-                            "not_found",
-                            "Resource not found",
-                            404,
-                        )
-
-                    # Success
-                    if response.status_code == 204:
-                        return None
-
-                    return response.json()
+                # Success
+                if response.status_code == 204:
+                    return None
+
+                return response.json()
 
             except ClockifyAPIError:
                 raise
             except httpx.TimeoutException as e:
                 last_exception = e
-                logger.warning(
-                    f"Clockify timeout on attempt {attempt + 1}/{self.max_retries}"
-                )
+                logger.warning(f"Clockify timeout on attempt {attempt + 1}/{self.max_retries}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep((2 ** attempt) * 0.5)
+                    record_retry("clockify", method, url_path, "timeout")
+                    await asyncio.sleep((2**attempt) * 0.5)
                     continue
             except Exception as e:
                 last_exception = e
                 logger.error(f"Clockify API call failed: {e}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep((2 ** attempt) * 0.5)
+                    record_retry("clockify", method, url_path, "error")
+                    await asyncio.sleep((2**attempt) * 0.5)
                     continue
 
         raise ClockifyAPIError(
@@ -176,54 +320,114 @@ class ClockifyClient:
             500,
         ) from last_exception
 
+    async def _paginate(
+        self,
+        path: str,
+        page_size: int | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Yield every page of a paginated list endpoint.
+        The next page is fetched in the background while the caller consumes
+        the current one; a short (or empty) page ends the iteration.
+        """
+        page_size = page_size or settings.CLOCKIFY_PAGE_SIZE
+        query = {**(params or {}), "page-size": page_size}
+
+        def fetch(page: int) -> asyncio.Task:
+            return asyncio.ensure_future(self._request("GET", path, params={**query, "page": page}))
+
+        page = 1
+        pending: asyncio.Task | None = fetch(page)
+        try:
+            while pending is not None:
+                data = await pending
+                pending = None
+                if len(data) >= page_size:
+                    page += 1
+                    pending = fetch(page)
+                if data:
+                    yield data
+        finally:
+            # Caller stopped early: drop the prefetch
+            if pending is not None:
+                pending.cancel()
+                if pending.done() and not pending.cancelled():
+                    pending.exception()
+
     async def get_user(self) -> ClockifyUser:
         """Get current user."""
         data = await self._request("GET", "/v1/user")
         return ClockifyUser(**data)
 
-    async def list_workspaces(self) -> List[ClockifyWorkspace]:
+    async def list_workspaces(self) -> list[ClockifyWorkspace]:
         """List all workspaces."""
         data = await self._request("GET", "/v1/workspaces")
         return [ClockifyWorkspace(**w) for w in data]
 
     async def get_workspace(self, workspace_id: str) -> ClockifyWorkspace:
-        """Get workspace by ID."""
-        data = await self._request("GET", f"/v1/workspaces/{workspace_id}")
-        return ClockifyWorkspace(**data)
+        """Get workspace by ID (cached)."""
+
+        async def load():
+            data = await self._request("GET", f"/v1/workspaces/{workspace_id}")
+            return ClockifyWorkspace(**data)
 
-    async def create_client(
-        self, workspace_id: str, body: ClientCreate
-    ) -> ClockifyClientModel:
+        return await self._cached(("workspace", workspace_id), load)
+
+    async def create_client(self, workspace_id: str, body: ClientCreate) -> ClockifyClientModel:
         """Create a client in workspace."""
         data = await self._request(
             "POST",
             f"/v1/workspaces/{workspace_id}/clients",
             json_body=body.model_dump(),
         )
+        self.invalidate_metadata(workspace_id, "clients")
         return ClockifyClientModel(**data)
 
-    async def list_clients(self, workspace_id: str) -> List[ClockifyClientModel]:
-        """List clients in workspace."""
-        data = await self._request("GET", f"/v1/workspaces/{workspace_id}/clients")
-        return [ClockifyClientModel(**c) for c in data]
+    async def iter_clients(
+        self, workspace_id: str, page_size: int | None = None
+    ) -> AsyncIterator[ClockifyClientModel]:
+        """Stream clients in workspace across all pages."""
+        async for data in self._paginate(f"/v1/workspaces/{workspace_id}/clients", page_size):
+            for c in data:
+                yield ClockifyClientModel(**c)
 
-    async def list_projects(self, workspace_id: str) -> List[ClockifyProject]:
-        """List projects in workspace."""
-        data = await self._request(
-            "GET",
-            f"/v1/workspaces/{workspace_id}/projects"
-        )
-        return [ClockifyProject(**p) for p in data]
+    async def list_clients(
+        self, workspace_id: str, page_size: int | None = None
+    ) -> list[ClockifyClientModel]:
+        """List all clients in workspace (every page, cached)."""
+
+        async def load():
+            return [c async for c in self.iter_clients(workspace_id, page_size)]
+
+        return list(await self._cached(("clients", workspace_id), load))
+
+    async def iter_projects(
+        self, workspace_id: str, page_size: int | None = None
+    ) -> AsyncIterator[ClockifyProject]:
+        """Stream projects in workspace across all pages."""
+        async for data in self._paginate(f"/v1/workspaces/{workspace_id}/projects", page_size):
+            for p in data:
+                yield ClockifyProject(**p)
+
+    async def list_projects(
+        self, workspace_id: str, page_size: int | None = None
+    ) -> list[ClockifyProject]:
+        """List all projects in workspace (every page, cached)."""
+
+        async def load():
+            return [p async for p in self.iter_projects(workspace_id, page_size)]
+
+        return list(await self._cached(("projects", workspace_id), load))
 
-    async def create_project(
-        self, workspace_id: str, body: ProjectCreate
-    ) -> ClockifyProject:
+    async def create_project(self, workspace_id: str, body: ProjectCreate) -> ClockifyProject:
         """Create a project in workspace."""
         data = await self._request(
             "POST",
             f"/v1/workspaces/{workspace_id}/projects",
             json_body=body.model_dump(exclude_none=True),
         )
+        self.invalidate_metadata(workspace_id, "projects")
         return ClockifyProject(**data)
 
     async def create_time_entry(
@@ -0,0 +1,178 @@
+"""
+Clockify webhook event classification.
+
+Clockify names the event in the `Clockify-Webhook-Event-Type` header
+(NEW_PROJECT, TIME_ENTRY_UPDATED, ...). Classification maps it to the
+normalized event type Clankerbot has always reported (PROJECT,
+TIME_ENTRY, ...) with one dict lookup. Without a known header the type
+is inferred from the payload by EVENT_RULES, each keyed by one
+discriminating field. Payloads of one event type share their set of
+fields, so the rule matched for a field set is memoized: after the first
+payload of each shape, classification is one frozenset build and one
+dict lookup.
+
+Payload shapes that Clockify shares between entities (a tag and a client
+are both {id, name, archived, workspaceId}; a deleted time entry looks
+like a running timer) can only be told apart by the header.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+UNKNOWN = "UNKNOWN"
+
+# Header event type -> normalized event type (every event in
+# Clockify_Webhook_JSON_Samples.md)
+EVENT_TYPES: dict[str, str] = {
+    "NEW_APPROVAL_REQUEST": "APPROVAL_REQUEST",
+    "APPROVAL_REQUEST_STATUS_UPDATED": "APPROVAL_REQUEST",
+    "ASSIGNMENT_CREATED": "ASSIGNMENT",
+    "ASSIGNMENT_DELETED": "ASSIGNMENT",
+    "ASSIGNMENT_PUBLISHED": "ASSIGNMENT",
+    "ASSIGNMENT_UPDATED": "ASSIGNMENT",
+    "BALANCE_UPDATED": "BALANCE",
+    "BILLABLE_RATE_UPDATED": "RATE",
+    "COST_RATE_UPDATED": "RATE",
+    "NEW_CLIENT": "CLIENT",
+    "CLIENT_UPDATED": "CLIENT",
+    "CLIENT_DELETED": "CLIENT",
+    "EXPENSE_CREATED": "EXPENSE",
+    "EXPENSE_UPDATED": "EXPENSE",
+    "EXPENSE_DELETED": "EXPENSE",
+    "EXPENSE_RESTORED": "EXPENSE",
+    "NEW_INVOICE": "INVOICE",
+    "INVOICE_UPDATED": "INVOICE",
+    "NEW_PROJECT": "PROJECT",
+    "PROJECT_UPDATED": "PROJECT",
+    "PROJECT_DELETED": "PROJECT",
+    "NEW_TAG": "TAG",
+    "TAG_UPDATED": "TAG",
+    "TAG_DELETED": "TAG",
+    "NEW_TASK": "TASK",
+    "TASK_UPDATED": "TASK",
+    "TASK_DELETED": "TASK",
+    "NEW_TIMER_STARTED": "NEW_TIMER_STARTED",
+    "TIMER_STOPPED": "TIME_ENTRY",
+    "NEW_TIME_ENTRY": "TIME_ENTRY",
+    "TIME_ENTRY_UPDATED": "TIME_ENTRY",
+    "TIME_ENTRY_DELETED": "TIME_ENTRY",
+    "TIME_ENTRY_RESTORED": "TIME_ENTRY",
+    "TIME_ENTRY_SPLIT": "TIME_ENTRY",
+    "TIME_ENTRY_BATCH_DELETED": "TIME_ENTRY",
+    "TIME_OFF_REQUESTED": "TIME_OFF",
+    "TIME_OFF_REQUEST_APPROVED": "TIME_OFF",
+    "TIME_OFF_REQUEST_REJECTED": "TIME_OFF",
+    "TIME_OFF_REQUEST_WITHDRAWN": "TIME_OFF",
+    "USER_JOINED_WORKSPACE": "USER",
+    "USER_ACTIVATED_ON_WORKSPACE": "USER",
+    "USER_DEACTIVATED_ON_WORKSPACE": "USER",
+    "USER_DELETED_FROM_WORKSPACE": "USER",
+    "USER_EMAIL_CHANGED": "USER",
+    "USER_UPDATED": "USER",
+    "USERS_INVITED_TO_WORKSPACE": "USER",
+    "LIMITED_USERS_ADDED_TO_WORKSPACE": "USER",
+    "USER_GROUP_CREATED": "USER_GROUP",
+    "USER_GROUP_UPDATED": "USER_GROUP",
+    "USER_GROUP_DELETED": "USER_GROUP",
+}
+
+
+class EventRule(NamedTuple):
+    """Payload rule for events delivered without a known event header."""
+
+    event_type: str
+    key: str  # discriminating field, tested first
+    required: frozenset[str] = frozenset()  # other fields that must be present
+    forbidden: frozenset[str] = frozenset()
+    # Optional per-payload refinement of event_type
+    refine: Callable[[dict[str, Any]], str] | None = None
+
+
+def _time_entry_type(payload: dict[str, Any]) -> str:
+    interval = payload.get("timeInterval") or {}
+    return "NEW_TIMER_STARTED" if interval.get("end") is None else "TIME_ENTRY"
+
+
+def _rule(
+    event_type: str, key: str, required: str = "", forbidden: str = "", refine=None
+) -> EventRule:
+    return EventRule(
+        event_type, key, frozenset(required.split()), frozenset(forbidden.split()), refine
+    )
+
+
+# The first rule whose fields are all present (and forbidden fields
+# absent) wins. No two event shapes in the samples share a discriminating
+# field (projects also carry "archived" but are excluded by "tasks"), so
+# for them the order does not matter. Use register_event_rule() to extend.
+EVENT_RULES: tuple[EventRule, ...] = (
+    _rule("TIME_ENTRY", "timeInterval", "userId", refine=_time_entry_type),
+    _rule("PROJECT", "tasks", "name workspaceId"),
+    # Tags share this shape; only the header identifies them
+    _rule("CLIENT", "archived", "name", forbidden="tasks"),
+    _rule("USER", "email", "id"),
+    _rule("TIME_OFF", "timeOffPeriod", "policyId"),
+    _rule("ASSIGNMENT", "assignmentId"),
+    _rule("TASK", "assigneeIds", "projectId"),
+    _rule("USER_GROUP", "teamManagers", "userIds"),
+    _rule("EXPENSE", "quantity", "categoryId billable"),
+    _rule("EXPENSE", "expenseId", "categoryId"),
+    _rule("APPROVAL_REQUEST", "dateRange", "status owner"),
+    _rule("INVOICE", "dueDate", "issuedDate items"),
+    _rule("RATE", "rateChangeSource", "modifiedEntity"),
+    _rule("USER", "inviter", "workspaceId"),
+    _rule("BALANCE", "updatedBy", "value userId"),
+)
+
+
+# Payload field set -> first matching rule (None: no rule matches)
+_signatures: dict[frozenset[str], EventRule | None] = {}
+# Field sets come from the sender, so the memo is bounded
+_MAX_SIGNATURES = 1024
+
+
+def _match_rule(fields: frozenset[str]) -> EventRule | None:
+    for rule in EVENT_RULES:
+        if rule.key in fields and rule.required <= fields and fields.isdisjoint(rule.forbidden):
+            return rule
+    return None
+
+
+def classify_event(payload: dict[str, Any], event_header: str | None = None) -> str:
+    """
+    Return the normalized event type of a Clockify webhook payload.
+
+    A known Clockify event header decides the type; otherwise it is
+    inferred from the payload fields. Unrecognized payloads are "UNKNOWN".
+    """
+    if event_header:
+        event_type = EVENT_TYPES.get(event_header)
+        if event_type is None:
+            event_type = EVENT_TYPES.get(event_header.strip().upper())
+        if event_type is not None:
+            return event_type
+
+    fields = frozenset(payload)
+    try:
+        rule = _signatures[fields]
+    except KeyError:
+        if len(_signatures) >= _MAX_SIGNATURES:
+            _signatures.clear()
+        rule = _signatures[fields] = _match_rule(fields)
+    if rule is None:
+        return UNKNOWN
+    return rule.refine(payload) if rule.refine is not None else rule.event_type
+
+
+def register_event_type(event_type: str, normalized: str) -> None:
+    """Add (or remap) a header event type."""
+    EVENT_TYPES[event_type] = normalized
+
+
+def register_event_rule(rule: EventRule, first: bool = False) -> None:
+    """Add a payload rule (last by default)."""
+    global EVENT_RULES
+    EVENT_RULES = (rule, *EVENT_RULES) if first else (*EVENT_RULES, rule)
+    _signatures.clear()
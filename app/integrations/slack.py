@@ -1,15 +1,33 @@
-
 from __future__ import annotations
-from typing import Dict, Any
+
+from typing import Any
+
 import httpx
-from .base import Integration, register_integration
+
 from app.config import settings
+from app.utils.http import PooledClient, create_http_client
+
+from .base import Integration, register_integration
 
 SLACK_API = "https://slack.com/api"
 
+
 @register_integration("slack")
 class SlackIntegration(Integration):
-    async def execute(self, operation: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def __init__(self):
+        self._pool = PooledClient(lambda: create_http_client(timeout=30, upstream="slack"))
+
+    def open(self) -> httpx.AsyncClient:
+        """Return the shared pooled HTTP client, creating it on first use."""
+        return self._pool.open()
+
+    async def startup(self) -> None:
+        self.open()
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+    async def execute(self, operation: str, params: dict[str, Any]) -> dict[str, Any]:
         token = settings.SLACK_BOT_TOKEN
         if not token:
             return {"ok": False, "error": "SLACK_BOT_TOKEN missing"}
@@ -18,19 +36,18 @@ class SlackIntegration(Integration):
             text = params.get("text")
             if not channel or not text:
                 return {"ok": False, "error": "channel and text required"}
-            async with httpx.AsyncClient(timeout=30) as client:
-                r = await client.post(
-                    f"{SLACK_API}/chat.postMessage",
-                    headers={"Authorization": f"Bearer {token}"},
-                    json={"channel": channel, "text": text},
-                )
-                try:
-                    return r.json()
-                except Exception:
-                    return {"status_code": r.status_code, "text": r.text}
+            r = await self.open().post(
+                f"{SLACK_API}/chat.postMessage",
+                headers={"Authorization": f"Bearer {token}"},
+                json={"channel": channel, "text": text},
+            )
+            try:
+                return r.json()
+            except Exception:
+                return {"status_code": r.status_code, "text": r.text}
         return {"ok": False, "error": f"unknown operation {operation}"}
 
-    async def handle_webhook(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_webhook(self, payload: dict[str, Any]) -> dict[str, Any]:
         if payload.get("type") == "url_verification" and "challenge" in payload:
             return {"challenge": payload["challenge"]}
         return {"ok": True, "received": True}
@@ -1,10 +1,14 @@
-
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
-import httpx
+
 import asyncio
 import logging
+from typing import Any
+
+import httpx
+
 from app.config import settings
+from app.observability.outbound import record_retry
+from app.utils.http import PooledClient, create_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -12,24 +16,48 @@ logger = logging.getLogger(__name__)
 class LLMClient:
     def __init__(
         self,
-        base_url: Optional[str] = None,
-        api_key: Optional[str] = None,
-        model: Optional[str] = None,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        model: str | None = None,
         timeout: float = 20.0,
         max_retries: int = 3,
+        limits: httpx.Limits | None = None,
+        http2: bool | None = None,
     ):
         self.base_url = (base_url or settings.LLM_BASE_URL).rstrip("/")
         self.api_key = api_key or settings.DEEPSEEK_API_KEY
         self.model = model or settings.LLM_MODEL
         self.timeout = timeout
         self.max_retries = max_retries
+        self.limits = limits or httpx.Limits(
+            max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY,
+        )
+        self.http2 = settings.LLM_HTTP2 if http2 is None else http2
+        self._pool = PooledClient(
+            lambda: create_http_client(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                upstream="llm",
+            )
+        )
+
+    def open(self) -> httpx.AsyncClient:
+        """Return the shared pooled HTTP client, creating it on first use."""
+        return self._pool.open()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release its connections."""
+        await self._pool.aclose()
 
     async def chat(
         self,
-        messages: List[Dict[str, str]],
+        messages: list[dict[str, str]],
         temperature: float = 0.0,
         stream: bool = False,
-    ) -> Dict[str, Any]:
+    ) -> dict[str, Any]:
         """
         Call LLM with exponential backoff retry on 429/5xx errors.
         Raises RuntimeError on missing API key or persistent failures.
@@ -49,32 +77,33 @@ class LLMClient:
             "stream": False,
         }
 
+        client = self.open()
+        url_path = httpx.URL(url).path
         last_exception = None
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    r = await client.post(url, headers=headers, json=payload)
-
-                    # Retry on 429 (rate limit) or 5xx (server errors)
-                    if r.status_code == 429 or r.status_code >= 500:
-                        delay = (2 ** attempt) * 0.5  # 0.5s, 1s, 2s
-                        logger.warning(
-                            f"LLM returned {r.status_code}, retrying in {delay}s (attempt {attempt + 1}/{self.max_retries})"
-                        )
-                        if attempt < self.max_retries - 1:
-                            await asyncio.sleep(delay)
-                            continue
-
-                    r.raise_for_status()
-                    return r.json()
+                r = await client.post(url, headers=headers, json=payload)
+
+                # Retry on 429 (rate limit) or 5xx (server errors)
+                if r.status_code == 429 or r.status_code >= 500:
+                    delay = (2**attempt) * 0.5  # 0.5s, 1s, 2s
+                    logger.warning(
+                        f"LLM returned {r.status_code}, retrying in {delay}s (attempt {attempt + 1}/{self.max_retries})"
+                    )
+                    if attempt < self.max_retries - 1:
+                        record_retry("llm", "POST", url_path, str(r.status_code))
+                        await asyncio.sleep(delay)
+                        continue
+
+                r.raise_for_status()
+                return r.json()
 
             except httpx.TimeoutException as e:
                 last_exception = e
-                logger.warning(
-                    f"LLM timeout on attempt {attempt + 1}/{self.max_retries}"
-                )
+                logger.warning(f"LLM timeout on attempt {attempt + 1}/{self.max_retries}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep((2 ** attempt) * 0.5)
+                    record_retry("llm", "POST", url_path, "timeout")
+                    await asyncio.sleep((2**attempt) * 0.5)
                     continue
             except httpx.HTTPStatusError as e:
                 # Non-retriable errors (4xx except 429)
@@ -82,19 +111,19 @@ class LLMClient:
                     raise RuntimeError(f"LLM API error: {e.response.status_code}") from e
                 last_exception = e
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep((2 ** attempt) * 0.5)
+                    record_retry("llm", "POST", url_path, str(e.response.status_code))
+                    await asyncio.sleep((2**attempt) * 0.5)
                     continue
             except Exception as e:
                 last_exception = e
                 logger.error(f"LLM call failed: {e}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep((2 ** attempt) * 0.5)
+                    record_retry("llm", "POST", url_path, "error")
+                    await asyncio.sleep((2**attempt) * 0.5)
                     continue
 
         # All retries exhausted
-        raise RuntimeError(
-            f"LLM call failed after {self.max_retries} attempts"
-        ) from last_exception
+        raise RuntimeError(f"LLM call failed after {self.max_retries} attempts") from last_exception
 
 
 client = LLMClient()
@@ -1,82 +1,138 @@
+import hmac
+import logging
+import random
+import time
+from pathlib import Path
 
-from fastapi import FastAPI, Request
+from dotenv import load_dotenv
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
-from starlette.middleware.base import BaseHTTPMiddleware
-from dotenv import load_dotenv
-import time
-import logging
-import os
-from pathlib import Path
-from app.utils.logging import configure_logging
-from app.utils.ids import request_id as get_request_id
-from app.config import settings
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from app import scheduler as sched
-from app.routes import actions as actions_routes
-from app.routes import webhooks_clockify
-from app.integrations.base import get_integration
-from app.models import WebhookEnvelope, ApiResponse
+from app.config import settings
+from app.integrations import clockify, slack  # noqa: F401  (registers integrations)
+from app.integrations.base import get_integration, list_integrations
+from app.llm import client as llm_client
 from app.middleware.ratelimit import RateLimitMiddleware
 from app.middleware.request_size import RequestSizeLimitMiddleware
+from app.middleware.tracing import TracingMiddleware
+from app.models import ApiResponse, WebhookEnvelope
+from app.observability import profiling
 from app.observability.metrics import setup_metrics
+from app.observability.tracing import setup_tracing, shutdown_tracing, traced_middleware
+from app.routes import actions as actions_routes
+from app.routes import webhooks_clockify
+from app.utils.ids import request_id as get_request_id
+from app.utils.jsonlib import FastJSONResponse
+from app.utils.logging import configure_logging, stop_log_listener
 
 load_dotenv()
 configure_logging()
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Clankerbot", version="0.2")
+app = FastAPI(title="Clankerbot", version="0.2", default_response_class=FastJSONResponse)
 
 # Setup Prometheus metrics if enabled
 setup_metrics(app)
 
+# Setup tracing if enabled (before middleware is added, see traced_middleware)
+setup_tracing()
+
 
 # Request ID and logging middleware
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Add request ID to all requests and responses, log request/response."""
+class RequestIDMiddleware:
+    """
+    Add request ID to all requests and responses, log request/response.
+
+    "Request completed" is always logged for errors (status >= 400) and
+    slow requests (LOG_SLOW_REQUEST_MS); other requests are sampled at
+    LOG_SAMPLE_RATE and skipped entirely on LOG_SKIP_PATHS. "Request
+    started" is logged at DEBUG.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float | None = None,
+        slow_ms: float | None = None,
+        skip_paths: str | None = None,
+    ):
+        self.app = app
+        self.sample_rate = settings.LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.slow_ms = settings.LOG_SLOW_REQUEST_MS if slow_ms is None else slow_ms
+        if skip_paths is None:
+            skip_paths = settings.LOG_SKIP_PATHS
+        self.skip_paths = frozenset(p.strip() for p in skip_paths.split(",") if p.strip())
+
+    def _should_log(self, path: str, status_code: int, duration_ms: float) -> bool:
+        """Sampling decision for the completion line."""
+        if status_code >= 400 or duration_ms >= self.slow_ms:
+            return True
+        if path in self.skip_paths:
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
         # Generate or extract request ID
-        req_id = get_request_id(request.headers.get("x-request-id"))
-        request.state.request_id = req_id
+        req_id = get_request_id(Headers(scope=scope).get("x-request-id"))
+        scope.setdefault("state", {})["request_id"] = req_id
+        method = scope["method"]
+        path = scope["path"]
 
         # Log request start
-        start_time = time.time()
-        logger.info(
-            f"Request started: {request.method} {request.url.path}",
-            extra={"request_id": req_id, "path": request.url.path},
-        )
+        start_time = time.perf_counter()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Request started: {method} {path}",
+                extra={"request_id": req_id, "path": path},
+            )
 
-        # Process request
-        response = await call_next(request)
-
-        # Log request finish
-        duration_ms = (time.time() - start_time) * 1000
-        logger.info(
-            f"Request completed: {request.method} {request.url.path} status={response.status_code}",
-            extra={
-                "request_id": req_id,
-                "path": request.url.path,
-                "status": response.status_code,
-                "duration_ms": round(duration_ms, 2),
-            },
-        )
+        status_code = 500
 
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = req_id
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add request ID to response headers
+                MutableHeaders(scope=message)["X-Request-ID"] = req_id
+            await send(message)
 
-        return response
+        # Process request
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            # Log request finish (sampled)
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            if self._should_log(path, status_code, duration_ms):
+                logger.log(
+                    logging.WARNING if status_code >= 500 else logging.INFO,
+                    f"Request completed: {method} {path} status={status_code}",
+                    extra={
+                        "request_id": req_id,
+                        "path": path,
+                        "status": status_code,
+                        "duration_ms": round(duration_ms, 2),
+                    },
+                )
 
 
 # Add middleware (order matters: applied in reverse)
-app.add_middleware(RequestIDMiddleware)
+app.add_middleware(traced_middleware(RequestIDMiddleware))
 app.add_middleware(
-    RateLimitMiddleware,
+    traced_middleware(RateLimitMiddleware),
     capacity=settings.RATE_LIMIT_PER_MINUTE,
     burst=settings.RATE_LIMIT_BURST,
 )
-app.add_middleware(RequestSizeLimitMiddleware)
+app.add_middleware(traced_middleware(RequestSizeLimitMiddleware))
 
 # CORS
 origins = [s.strip() for s in settings.CORS_ORIGINS.split(",") if s.strip()]
@@ -86,20 +142,41 @@ if not origins or not any(origins):
     logger.info("CORS_ORIGINS not set, using defaults: localhost:3000, localhost:8080")
 
 app.add_middleware(
-    CORSMiddleware,
+    traced_middleware(CORSMiddleware),
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Outermost: one server span per request (no-op unless TRACING_ENABLED)
+app.add_middleware(TracingMiddleware)
+
 
 @app.on_event("startup")
 async def _startup():
     sched.start_scheduler()
+    for name in list_integrations():
+        await get_integration(name).startup()
+    llm_client.open()
+    await webhooks_clockify.ingest_queue.start()
     logger.info("Clankerbot started successfully")
 
 
+@app.on_event("shutdown")
+async def _shutdown():
+    await webhooks_clockify.ingest_queue.stop(settings.WEBHOOK_QUEUE_DRAIN_SECONDS)
+    for name in list_integrations():
+        try:
+            await get_integration(name).aclose()
+        except Exception as e:
+            logger.warning(f"Integration {name} shutdown failed: {e}")
+    await llm_client.aclose()
+    logger.info("Clankerbot stopped")
+    shutdown_tracing()
+    stop_log_listener()
+
+
 # Health endpoints
 @app.get("/healthz")
 async def health(request: Request):
@@ -118,7 +195,6 @@ async def metrics_endpoint():
     """
     # The actual metrics endpoint is exposed by prometheus-fastapi-instrumentator
     # This is just for OpenAPI documentation
-    pass
 
 
 @app.get("/readyz")
@@ -152,6 +228,77 @@ async def readiness(request: Request):
     )
 
 
+@app.get("/admin/profile", tags=["observability"])
+async def admin_profile(
+    request: Request,
+    mode: str = Query("cpu", pattern="^(cpu|memory)$"),
+    format: str = Query("collapsed", pattern="^(collapsed|pstats|text)$"),
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1),
+):
+    """
+    Capture a time-boxed profile of this process while it keeps serving.
+
+    - mode=cpu&format=collapsed: sampled stacks of all threads (flamegraph input)
+    - mode=cpu&format=pstats: cProfile of the event loop (pstats file)
+    - mode=cpu&format=text: the same, as a cumulative-time summary
+    - mode=memory: tracemalloc top allocation sites over the window
+
+    Disabled unless ADMIN_TOKEN is set; send it as X-Admin-Token.
+    """
+    req_id = get_request_id(request.headers.get("x-request-id"))
+
+    if not settings.ADMIN_TOKEN:
+        return FastJSONResponse(
+            status_code=404,
+            content=ApiResponse.failure(
+                code="not_found",
+                message="Profiling is disabled (ADMIN_TOKEN not set)",
+                request_id=req_id,
+            ),
+        )
+    token = request.headers.get("x-admin-token")
+    if not token:
+        return FastJSONResponse(
+            status_code=401,
+            content=ApiResponse.failure(
+                code="unauthorized", message="Missing X-Admin-Token header", request_id=req_id
+            ),
+        )
+    if not hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        logger.warning(f"Invalid admin token in request {req_id}")
+        return FastJSONResponse(
+            status_code=403,
+            content=ApiResponse.failure(
+                code="forbidden", message="Invalid X-Admin-Token header", request_id=req_id
+            ),
+        )
+
+    seconds = min(seconds, settings.PROFILE_MAX_SECONDS)
+    logger.info(f"Profiling started: mode={mode} format={format} seconds={seconds}")
+    try:
+        if mode == "memory":
+            return PlainTextResponse(await profiling.trace_memory(seconds))
+        if format == "collapsed":
+            return PlainTextResponse(
+                await profiling.sample_cpu(seconds, interval=interval_ms / 1000)
+            )
+        data = await profiling.trace_cpu(seconds)
+        if format == "text":
+            return PlainTextResponse(profiling.pstats_summary(data))
+        return Response(
+            content=data,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="clankerbot-{req_id}.pstats"'},
+        )
+    except profiling.ProfileBusyError as e:
+        return FastJSONResponse(
+            status_code=503,
+            headers={"Retry-After": str(int(seconds))},
+            content=ApiResponse.failure(code="unavailable", message=str(e), request_id=req_id),
+        )
+
+
 # Mount static files for manual testing UI
 tools_dir = Path(__file__).parent.parent / "tools"
 if tools_dir.exists():
@@ -176,9 +323,7 @@ async def webhook(request: Request, provider: str, env: WebhookEnvelope):
         # Delegate to specific router if clockify
         if provider == "clockify":
             # Redirect to dedicated endpoint
-            logger.info(
-                "Redirecting legacy webhook to dedicated Clockify endpoint"
-            )
+            logger.info("Redirecting legacy webhook to dedicated Clockify endpoint")
 
         integ = get_integration(provider)
         result = await integ.handle_webhook(env.payload)
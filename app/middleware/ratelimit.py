@@ -1,17 +1,47 @@
 """
-Simple in-memory token bucket rate limiter.
+Token bucket rate limiter with pluggable bucket storage.
+
+The in-memory backend is per process; the SQLite backend shares buckets
+between all workers on a host so limits are not multiplied by the number
+of uvicorn workers.
 """
+
+import logging
 import time
-from collections import defaultdict
-from typing import Dict, Tuple
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import NamedTuple
+from urllib.parse import parse_qsl
+
 from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import RateLimitPolicy, settings
+from app.observability.metrics import rate_limit_buckets, rate_limits_total
+from app.utils.cache import TTLCache
+from app.utils.sqlite import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+BucketKey = tuple[str, str]  # (client_ip, route template)
+
+# Bucket "path" for requests that match no route, so scans over random
+# paths share one bucket per client instead of creating one per path
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Policy name of the middleware-wide limit; route policies with their own
+# capacity/burst get separate buckets named after their policy key
+DEFAULT_POLICY = "default"
 
 
 class TokenBucket:
     """Token bucket for rate limiting with burst support."""
 
+    __slots__ = ("burst", "capacity", "last_refill", "refill_rate", "tokens")
+
     def __init__(self, capacity: int, refill_rate: float, burst: int = None):
         self.capacity = capacity
         self.burst = burst if burst is not None else capacity
@@ -27,6 +57,15 @@ class TokenBucket:
             return True
         return False
 
+    def time_until(self, tokens: int = 1) -> float:
+        """Seconds until `tokens` can be consumed (0 if available now)."""
+        self._refill()
+        if self.tokens >= tokens:
+            return 0.0
+        if self.refill_rate <= 0:
+            return float("inf")
+        return (tokens - self.tokens) / self.refill_rate
+
     def _refill(self):
         """Refill tokens based on elapsed time up to burst capacity."""
         now = time.time()
@@ -36,42 +75,340 @@ class TokenBucket:
         self.last_refill = now
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitBackend(ABC):
+    """Storage for token buckets keyed by (client_ip, path)."""
+
+    def __init__(self, capacity: int, refill_rate: float, burst: int, policy: str = DEFAULT_POLICY):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.burst = burst
+        self.policy = policy
+        # Time for an empty bucket to refill to burst; idle buckets older
+        # than this are equivalent to new ones and can be dropped
+        self.idle_ttl = burst / refill_rate if refill_rate > 0 else float("inf")
+
+    @abstractmethod
+    async def consume(self, key: BucketKey, tokens: int = 1) -> bool:
+        """Try to consume tokens from the key's bucket. Returns True if allowed."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process buckets kept in LRU order and bounded: buckets idle long
+    enough to have refilled completely are swept, and the least recently
+    used bucket is evicted beyond max_buckets.
+    """
+
+    # Seconds between idle-bucket sweeps
+    sweep_interval = 60.0
+
+    def __init__(
+        self,
+        capacity: int,
+        refill_rate: float,
+        burst: int,
+        max_buckets: int,
+        policy: str = DEFAULT_POLICY,
+    ):
+        super().__init__(capacity, refill_rate, burst, policy)
+        self.max_buckets = max_buckets
+        self.buckets: OrderedDict[BucketKey, TokenBucket] = OrderedDict()
+        self._next_sweep = time.time() + self.sweep_interval
+        _memory_backends.add(self)
+
+    async def consume(self, key: BucketKey, tokens: int = 1) -> bool:
+        return self._get_bucket(key).consume(tokens)
+
+    def _get_bucket(self, key: BucketKey) -> TokenBucket:
+        """Get (or create) the bucket for key, marking it most recently used."""
+        now = time.time()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            self.buckets.move_to_end(key)
+            return bucket
+
+        bucket = TokenBucket(self.capacity, self.refill_rate, self.burst)
+        self.buckets[key] = bucket
+        if len(self.buckets) > self.max_buckets:
+            self.buckets.popitem(last=False)
+        return bucket
+
+    def _sweep(self, now: float) -> None:
+        """Drop buckets idle for at least idle_ttl (oldest first)."""
+        cutoff = now - self.idle_ttl
+        while self.buckets:
+            key, bucket = next(iter(self.buckets.items()))
+            if bucket.last_refill > cutoff:
+                break
+            del self.buckets[key]
+        self._next_sweep = now + self.sweep_interval
+
+
+# Every route policy with its own capacity has its own memory backend; the
+# gauge reports their total, computed at scrape time
+_memory_backends: "weakref.WeakSet[MemoryRateLimitBackend]" = weakref.WeakSet()
+rate_limit_buckets.labels(service="clankerbot").set_function(
+    lambda: sum(len(backend.buckets) for backend in list(_memory_backends))
+)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Buckets stored in a SQLite file shared by every worker on the host.
+    Each consume is one short IMMEDIATE transaction run in a worker thread.
+
+    Backends for different policies share the table; rows are keyed by
+    policy as well, and each backend only prunes its own policy's rows
+    (its idle_ttl depends on its refill rate).
+    """
+
+    # Delete idle buckets every N writes rather than on each one
+    PRUNE_EVERY = 1000
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int,
+        refill_rate: float,
+        burst: int,
+        clock=time.time,
+        policy: str = DEFAULT_POLICY,
+    ):
+        super().__init__(capacity, refill_rate, burst, policy)
+        self.path = path
+        self._clock = clock
+        self._db = SQLiteDatabase(path)
+        with self._db.transaction() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(rate_limit_buckets)")}
+            # Buckets are transient: a table from before policies were
+            # part of the key is dropped rather than migrated
+            if columns and "policy" not in columns:
+                conn.execute("DROP TABLE rate_limit_buckets")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "policy TEXT NOT NULL, client TEXT NOT NULL, path TEXT NOT NULL, "
+                "tokens REAL NOT NULL, last_refill REAL NOT NULL, "
+                "PRIMARY KEY (policy, client, path))"
+            )
+
+    def _consume(self, key: BucketKey, tokens: int) -> bool:
+        now = self._clock()
+        with self._db.transaction() as conn:
+            row = conn.execute(
+                "SELECT tokens, last_refill FROM rate_limit_buckets "
+                "WHERE policy = ? AND client = ? AND path = ?",
+                (self.policy, *key),
+            ).fetchone()
+            if row is None:
+                available = float(self.burst)
+            else:
+                elapsed = max(now - row[1], 0.0)
+                available = min(self.burst, row[0] + elapsed * self.refill_rate)
+            allowed = available >= tokens
+            if allowed:
+                available -= tokens
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets "
+                "(policy, client, path, tokens, last_refill) VALUES (?, ?, ?, ?, ?)",
+                (self.policy, *key, available, now),
+            )
+            if self._db.count_write(self.PRUNE_EVERY):
+                conn.execute(
+                    "DELETE FROM rate_limit_buckets WHERE policy = ? AND last_refill <= ?",
+                    (self.policy, now - self.idle_ttl),
+                )
+        return allowed
+
+    async def consume(self, key: BucketKey, tokens: int = 1) -> bool:
+        return await self._db.run(self._consume, key, tokens)
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def create_rate_limit_backend(
+    capacity: int,
+    refill_rate: float,
+    burst: int,
+    max_buckets: int | None = None,
+    policy: str = DEFAULT_POLICY,
+) -> RateLimitBackend:
+    """Create the rate limit backend selected by RATE_LIMIT_BACKEND."""
+    backend = settings.RATE_LIMIT_BACKEND.lower()
+    if backend == "sqlite":
+        return SQLiteRateLimitBackend(
+            settings.RATE_LIMIT_SQLITE_PATH, capacity, refill_rate, burst, policy=policy
+        )
+    if backend != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND {backend!r}, using memory")
+    return MemoryRateLimitBackend(
+        capacity,
+        refill_rate,
+        burst,
+        max_buckets if max_buckets is not None else settings.RATE_LIMIT_MAX_BUCKETS,
+        policy,
+    )
+
+
+def _match_template(routes: Iterable, scope: Scope) -> str | None:
+    """Path template of the first route matching scope (FULL beats PARTIAL)."""
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.NONE:
+            continue
+        nested = getattr(route, "original_router", None)  # FastAPI include_router()
+        if nested is not None:
+            template = _match_template(nested.routes, scope)
+        else:
+            template = getattr(route, "path", None)
+        if match == Match.FULL:
+            return template
+        if partial is None:
+            partial = template
+    return partial
+
+
+class _RouteLimit(NamedTuple):
+    """Resolved limit for a route: where its buckets live and what it costs."""
+
+    backend: RateLimitBackend | None  # None means exempt
+    capacity: int
+    cost: int
+
+
+class RateLimitMiddleware:
     """
-    Rate limit middleware using in-memory token bucket with burst capacity.
-    Keyed by (client_ip, path).
+    Rate limit middleware using token buckets with burst capacity.
+    Keyed by (client_ip, route template), so /items/1 and /items/2 share a
+    bucket and unknown paths share one per client. Implemented as plain
+    ASGI middleware; bucket storage comes from RATE_LIMIT_BACKEND unless a
+    backend is passed.
+
+    Per-route policies (RATE_LIMIT_ROUTE_POLICIES) can exempt a route, give
+    it its own capacity/burst, or charge several tokens per request. A
+    policy key may carry one "?param=value" condition, e.g.
+    "/actions/parse?llm=true"; conditional policies win over plain ones.
     """
 
-    def __init__(self, app, capacity: int = 60, burst: int = None):
-        super().__init__(app)
+    def __init__(
+        self,
+        app: ASGIApp,
+        capacity: int = 60,
+        burst: int = None,
+        max_buckets: int | None = None,
+        backend: RateLimitBackend | None = None,
+        policies: dict[str, RateLimitPolicy] | None = None,
+        exempt_paths: Iterable[str] | None = None,
+    ):
+        self.app = app
         self.capacity = capacity
         self.burst = burst if burst is not None else capacity
         self.refill_rate = capacity / 60.0  # refill rate per second
-        self.buckets: Dict[Tuple[str, str], TokenBucket] = defaultdict(
-            lambda: TokenBucket(self.capacity, self.refill_rate, self.burst)
+        self.max_buckets = max_buckets
+        self.backend = backend or create_rate_limit_backend(
+            self.capacity, self.refill_rate, self.burst, max_buckets
         )
+        self._default_limit = _RouteLimit(self.backend, self.capacity, 1)
 
-    async def dispatch(self, request: Request, call_next):
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
+        if policies is None:
+            policies = settings.RATE_LIMIT_ROUTE_POLICIES
+        if exempt_paths is None:
+            exempt_paths = [
+                p.strip() for p in settings.RATE_LIMIT_EXEMPT_PATHS.split(",") if p.strip()
+            ]
+        policies = {**{p: RateLimitPolicy(exempt=True) for p in exempt_paths}, **policies}
+
+        # template -> [(query condition or None, limit)], conditional first
+        self._route_limits: dict[str, list[tuple[tuple[str, str] | None, _RouteLimit]]] = {}
+        for key, policy in policies.items():
+            template, _, query = key.partition("?")
+            condition = tuple(query.split("=", 1)) if "=" in query else None
+            entries = self._route_limits.setdefault(template, [])
+            entries.append((condition, self._build_limit(key, policy)))
+            entries.sort(key=lambda entry: entry[0] is None)
+
+        self._templates = TTLCache(maxsize=4096, ttl=float("inf"))
+
+    def _build_limit(self, key: str, policy: RateLimitPolicy) -> _RouteLimit:
+        if policy.exempt:
+            return _RouteLimit(None, 0, 0)
+        if policy.capacity is None and policy.burst is None:
+            backend, capacity = self.backend, self.capacity
+            burst = self.burst
+        else:
+            capacity = policy.capacity if policy.capacity is not None else self.capacity
+            burst = policy.burst if policy.burst is not None else capacity
+            backend = create_rate_limit_backend(
+                capacity, capacity / 60.0, burst, self.max_buckets, policy=key
+            )
+        if policy.cost > burst:
+            logger.warning(
+                f"Rate limit policy {key!r}: cost {policy.cost} exceeds burst {burst}, "
+                "requests will always be rejected"
+            )
+        return _RouteLimit(backend, capacity, policy.cost)
+
+    def _route_template(self, scope: Scope) -> str:
+        """Template of the route serving this request (cached per method+path)."""
+        cache_key = (scope["method"], scope["path"])
+        template = self._templates.get(cache_key)
+        if template is not None:
+            return template
+
+        template = _match_template(getattr(scope.get("app"), "routes", ()), scope)
+        if template is None:
+            template = UNMATCHED_ROUTE
+        self._templates.set(cache_key, template)
+        return template
 
-        # Create bucket key
-        path = request.url.path
-        key = (client_ip, path)
+    def _resolve(self, scope: Scope, template: str) -> _RouteLimit:
+        """Pick the policy for this request's route (and query, if conditional)."""
+        entries = self._route_limits.get(template)
+        if not entries:
+            return self._default_limit
+        query = None
+        for condition, limit in entries:
+            if condition is None:
+                return limit
+            if query is None:
+                query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+            if query.get(condition[0]) == condition[1]:
+                return limit
+        return self._default_limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        template = self._route_template(scope)
+        limit = self._resolve(scope, template)
+        if limit.backend is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Get client IP
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
 
         # Check rate limit
-        bucket = self.buckets[key]
-        if not bucket.consume():
-            return JSONResponse(
+        if not await limit.backend.consume((client_ip, template), limit.cost):
+            rate_limits_total.labels(service="clankerbot").inc()
+            response = JSONResponse(
                 status_code=429,
                 content={
                     "ok": False,
                     "error": {
                         "code": "rate_limited",
-                        "message": f"Rate limit exceeded. Max {self.capacity} requests per minute.",
+                        "message": f"Rate limit exceeded. Max {limit.capacity} requests per minute.",
                     },
                 },
             )
+            await response(scope, receive, send)
+            return
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
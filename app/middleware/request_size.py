@@ -1,30 +1,39 @@
 """
 Request size limit middleware for security.
 """
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+
+import logging
+
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from app.config import settings
-import logging
 
 logger = logging.getLogger(__name__)
 
 
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
+class RequestSizeLimitMiddleware:
     """
     Middleware to limit request body size to prevent DoS attacks.
-    Checks Content-Length header before reading the body.
+    Checks Content-Length header before reading the body, then counts
+    streamed body chunks (e.g. chunked uploads without Content-Length) and
+    answers 413 as soon as the limit is crossed, without reading the rest.
     """
 
-    def __init__(self, app, max_size_bytes: int = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, max_size_bytes: int = None):
+        self.app = app
         if max_size_bytes is None:
             max_size_bytes = settings.MAX_REQUEST_SIZE_MB * 1024 * 1024
         self.max_size_bytes = max_size_bytes
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Check Content-Length header
-        content_length = request.headers.get("content-length")
+        content_length = Headers(scope=scope).get("content-length")
 
         if content_length:
             try:
@@ -34,19 +43,61 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
                         f"Request rejected: body size {content_length_int} bytes "
                         f"exceeds limit of {self.max_size_bytes} bytes"
                     )
-                    return JSONResponse(
-                        status_code=413,
-                        content={
-                            "ok": False,
-                            "error": {
-                                "code": "payload_too_large",
-                                "message": f"Request body too large. Maximum size is {self.max_size_bytes / (1024 * 1024):.1f}MB",
-                            },
-                        },
-                    )
+                    await self._too_large()(scope, receive, send)
+                    return
             except ValueError:
                 # Invalid Content-Length header, let the framework handle it
                 pass
 
-        response = await call_next(request)
-        return response
+        # Enforce the limit on the body as it streams in
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size_bytes:
+                    rejected = True
+                    logger.warning(
+                        f"Request rejected: streamed body exceeded limit of "
+                        f"{self.max_size_bytes} bytes"
+                    )
+                    if not response_started:
+                        await self._too_large(close=True)(scope, receive, send)
+                    # Look like a client disconnect so the app stops reading
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if rejected:
+                # The 413 has been sent; drop whatever the app answers
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+    def _too_large(self, close: bool = False) -> JSONResponse:
+        """Build the 413 payload_too_large envelope."""
+        return JSONResponse(
+            status_code=413,
+            headers={"Connection": "close"} if close else None,
+            content={
+                "ok": False,
+                "error": {
+                    "code": "payload_too_large",
+                    "message": f"Request body too large. Maximum size is {self.max_size_bytes / (1024 * 1024):.1f}MB",
+                },
+            },
+        )
@@ -0,0 +1,56 @@
+"""
+Request tracing middleware (see app.observability.tracing).
+"""
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.observability import tracing
+
+
+class TracingMiddleware:
+    """
+    Run each HTTP request inside a server span, continuing an incoming W3C
+    trace context. The span is renamed to the matched route template once
+    routing has happened and records the status code and X-Request-ID.
+    Passes requests straight through when tracing is off.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracing.tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        method = scope["method"]
+        status_code = 500
+        request_id = headers.get("x-request-id")
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code, request_id
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                request_id = Headers(raw=message.get("headers", [])).get("x-request-id", request_id)
+            await send(message)
+
+        with tracing.start_span(
+            f"{method} {scope['path']}",
+            kind=tracing.SERVER,
+            context=tracing.extract_context(dict(headers)),
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if getattr(route, "path", None):
+                    span.update_name(f"{method} {route.path}")
+                    span.set_attribute("http.route", route.path)
+                span.set_attribute("http.response.status_code", status_code)
+                if request_id:
+                    span.set_attribute("request.id", request_id)
+                if status_code >= 500:
+                    tracing.mark_error(span, f"HTTP {status_code}")
@@ -1,6 +1,6 @@
+from typing import Any
 
 from pydantic import BaseModel, Field
-from typing import Any, Dict, Optional
 
 
 class HumanCommand(BaseModel):
@@ -10,22 +10,27 @@ class HumanCommand(BaseModel):
 class Action(BaseModel):
     integration: str
     operation: str
-    params: Dict[str, Any] = Field(default_factory=dict)
+    params: dict[str, Any] = Field(default_factory=dict)
 
 
 class RunActionRequest(Action):
     pass
 
 
+class RunBatchRequest(BaseModel):
+    actions: list[RunActionRequest]
+    concurrency: int | None = Field(default=None, ge=1)
+
+
 class CronSpec(BaseModel):
-    year: Optional[str] = None
-    month: Optional[str] = None
-    day: Optional[str] = None
-    week: Optional[str] = None
-    day_of_week: Optional[str] = None
-    hour: Optional[str] = None
-    minute: Optional[str] = None
-    second: Optional[str] = None
+    year: str | None = None
+    month: str | None = None
+    day: str | None = None
+    week: str | None = None
+    day_of_week: str | None = None
+    hour: str | None = None
+    minute: str | None = None
+    second: str | None = None
 
 
 class ScheduleRequest(Action):
@@ -33,22 +38,24 @@ class ScheduleRequest(Action):
 
 
 class WebhookEnvelope(BaseModel):
-    payload: Dict[str, Any] = Field(default_factory=dict)
+    payload: dict[str, Any] = Field(default_factory=dict)
 
 
 # API Response Envelopes
 class ApiError(BaseModel):
     """Structured error response."""
+
     code: str
     message: str
-    details: Optional[Dict[str, Any]] = None
+    details: dict[str, Any] | None = None
 
 
 class ApiResponse(BaseModel):
     """Standard API response envelope."""
+
     ok: bool
-    data: Optional[Any] = None
-    error: Optional[ApiError] = None
+    data: Any | None = None
+    error: ApiError | None = None
     requestId: str = ""
 
     @classmethod
@@ -61,7 +68,7 @@ class ApiResponse(BaseModel):
         cls,
         code: str,
         message: str,
-        details: Optional[Dict[str, Any]] = None,
+        details: dict[str, Any] | None = None,
         request_id: str = "",
     ) -> "ApiResponse":
         """Create an error response."""
@@ -1,10 +1,11 @@
 """
 Prometheus metrics configuration for Clankerbot.
 """
+
 import os
-from prometheus_client import Counter
-from prometheus_fastapi_instrumentator import Instrumentator
 
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_fastapi_instrumentator import Instrumentator
 
 # Custom metrics
 webhook_duplicates_total = Counter(
@@ -25,6 +26,85 @@ parser_fallbacks_total = Counter(
     ["service"],
 )
 
+log_records_dropped_total = Counter(
+    "log_records_dropped_total",
+    "Total number of log records dropped because the log queue was full",
+    ["service"],
+)
+
+parse_cache_hits_total = Counter(
+    "parse_cache_hits_total",
+    "Total number of LLM parse results served from cache",
+    ["service"],
+)
+
+parse_cache_misses_total = Counter(
+    "parse_cache_misses_total",
+    "Total number of LLM parse cache misses",
+    ["service"],
+)
+
+parse_coalesced_total = Counter(
+    "parse_coalesced_total",
+    "Total number of LLM parses that joined an identical in-flight request",
+    ["service"],
+)
+
+rate_limit_buckets = Gauge(
+    "rate_limit_buckets",
+    "Number of live rate limit token buckets",
+    ["service"],
+)
+
+webhook_queue_depth = Gauge(
+    "webhook_queue_depth",
+    "Number of webhook events waiting in the ingestion queue",
+    ["service", "queue"],
+)
+
+webhook_queue_latency_seconds = Histogram(
+    "webhook_queue_latency_seconds",
+    "Time webhook events spend queued before a worker picks them up",
+    ["service", "queue"],
+)
+
+webhook_queue_rejected_total = Counter(
+    "webhook_queue_rejected_total",
+    "Total number of webhook events rejected because the queue was full",
+    ["service", "queue"],
+)
+
+webhook_stage_duration_seconds = Histogram(
+    "webhook_stage_duration_seconds",
+    "Time spent in each stage of webhook handling",
+    ["service", "stage", "event_type"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+outbound_request_duration_seconds = Histogram(
+    "outbound_request_duration_seconds",
+    "Latency of individual outbound HTTP attempts",
+    ["service", "upstream", "operation", "status_class"],
+)
+
+outbound_requests_total = Counter(
+    "outbound_requests_total",
+    "Total number of outbound HTTP attempts by response status",
+    ["service", "upstream", "operation", "status"],
+)
+
+outbound_retries_total = Counter(
+    "outbound_retries_total",
+    "Total number of outbound HTTP retries",
+    ["service", "upstream", "operation", "reason"],
+)
+
+outbound_requests_inflight = Gauge(
+    "outbound_requests_inflight",
+    "Outbound HTTP requests currently awaiting a response",
+    ["service", "upstream"],
+)
+
 
 def setup_metrics(app):
     """
@@ -0,0 +1,149 @@
+"""
+Instrumentation for outbound HTTP calls (Clockify, Slack, LLM).
+
+`InstrumentedTransport` wraps the httpx transport built by
+`create_http_client(upstream=...)` and records, per upstream and
+operation, attempt latency, status counts and in-flight requests.
+Connection pool usage is reported at scrape time as
+`outbound_pool_connections`. Clients count their own retries with
+`record_retry`, since only they know why a request is repeated.
+When tracing is enabled each attempt is also a client span.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+import weakref
+from collections.abc import Iterator
+
+import httpx
+from prometheus_client import REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+from app.observability import tracing
+from app.observability.metrics import (
+    outbound_request_duration_seconds,
+    outbound_requests_inflight,
+    outbound_requests_total,
+    outbound_retries_total,
+)
+
+# Path segments that are resource IDs (Clockify ObjectIds, UUIDs, numbers)
+_ID_SEGMENT = re.compile(
+    r"^(?:[0-9a-fA-F]{24}|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)$"
+)
+
+
+def operation_name(method: str, path: str) -> str:
+    """Low-cardinality operation label, e.g. "GET /v1/workspaces/{id}/projects"."""
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+def record_retry(upstream: str, method: str, path: str, reason: str) -> None:
+    """Count a retry of an outbound call (reason: status code, "timeout", "error")."""
+    outbound_retries_total.labels(
+        service="clankerbot",
+        upstream=upstream,
+        operation=operation_name(method, path),
+        reason=reason,
+    ).inc()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper recording metrics for every attempt it sends."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstream: str):
+        self.transport = transport
+        self.upstream = upstream
+        _transports.add(self)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not tracing.tracing_enabled():
+            return await self._send(request)
+        with tracing.start_span(
+            f"{self.upstream} {operation_name(request.method, request.url.path)}",
+            kind=tracing.CLIENT,
+            attributes={
+                "http.request.method": request.method,
+                "server.address": request.url.host,
+                "url.path": request.url.path,
+                "upstream": self.upstream,
+            },
+        ) as span:
+            response = await self._send(request)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                tracing.mark_error(span, f"HTTP {response.status_code}")
+            return response
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        operation = operation_name(request.method, request.url.path)
+        inflight = outbound_requests_inflight.labels(service="clankerbot", upstream=self.upstream)
+        status = "error"
+        started = time.perf_counter()
+        inflight.inc()
+        try:
+            response = await self.transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            # Time to response headers; streamed bodies are read afterwards
+            inflight.dec()
+            outbound_request_duration_seconds.labels(
+                service="clankerbot",
+                upstream=self.upstream,
+                operation=operation,
+                status_class=f"{status[0]}xx" if status != "error" else status,
+            ).observe(time.perf_counter() - started)
+            outbound_requests_total.labels(
+                service="clankerbot",
+                upstream=self.upstream,
+                operation=operation,
+                status=status,
+            ).inc()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def pool_stats(self) -> dict | None:
+        """Connection counts of the wrapped httpcore pool, if it exposes them."""
+        # httpcore internals: anything else (e.g. a mock transport) reports nothing
+        try:
+            pool = self.transport._pool
+            connections = pool.connections
+            idle = sum(1 for c in connections if c.is_idle())
+            pending = sum(1 for r in pool._requests if r.is_queued())
+        except (AttributeError, TypeError):
+            return None
+        return {"active": len(connections) - idle, "idle": idle, "pending": pending}
+
+
+# Live instrumented transports, read when Prometheus scrapes
+_transports: weakref.WeakSet[InstrumentedTransport] = weakref.WeakSet()
+
+
+class _PoolCollector:
+    """Report connection pool usage of all live instrumented transports."""
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        family = GaugeMetricFamily(
+            "outbound_pool_connections",
+            "Outbound HTTP pool connections by state (active, idle, pending requests)",
+            labels=["service", "upstream", "state"],
+        )
+        totals: dict = {}
+        for transport in list(_transports):
+            stats = transport.pool_stats()
+            if not stats:
+                continue
+            for state, count in stats.items():
+                key = (transport.upstream, state)
+                totals[key] = totals.get(key, 0) + count
+        for (upstream, state), count in sorted(totals.items()):
+            family.add_metric(["clankerbot", upstream, state], count)
+        yield family
+
+
+REGISTRY.register(_PoolCollector())
@@ -0,0 +1,148 @@
+"""
+On-demand profiling for a running process (see GET /admin/profile).
+
+- CPU, sampled: a background thread snapshots every thread's stack at a
+  fixed interval and returns collapsed stacks ("a;b;c count" lines, the
+  input format of flamegraph.pl, speedscope and inferno). Overhead is
+  bounded by the interval and the event loop is never paused.
+- CPU, deterministic: cProfile on the event loop thread for the window,
+  returned as a pstats file (`python -m pstats`, snakeviz).
+- Memory: tracemalloc snapshots at the start and end of the window,
+  returned as the top allocation sites by growth.
+
+Only one profile runs at a time per process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+_lock = asyncio.Lock()
+_ROOT = str(Path(__file__).resolve().parents[2]) + os.sep
+_SITE_PACKAGES = "site-packages" + os.sep
+
+
+class ProfileBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+@asynccontextmanager
+async def _exclusive() -> AsyncIterator[None]:
+    """Hold the profiling lock, failing fast if a profile is already running."""
+    if _lock.locked():
+        raise ProfileBusyError("A profile is already running")
+    async with _lock:
+        yield
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    # Trim project / site-packages prefixes so stacks stay readable
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT) :]
+    else:
+        index = filename.rfind(_SITE_PACKAGES)
+        if index >= 0:
+            filename = filename[index + len(_SITE_PACKAGES) :]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _sample_stacks(seconds: float, interval: float) -> Counter:
+    """Collect stack samples of all other threads for `seconds`."""
+    own = threading.get_ident()
+    stacks: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names: dict[int, str] = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            stacks[";".join(reversed(labels))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+async def sample_cpu(seconds: float, interval: float = 0.005) -> str:
+    """Sampled CPU profile of the whole process as collapsed stacks."""
+    async with _exclusive():
+        stacks = await asyncio.to_thread(_sample_stacks, seconds, interval)
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+async def trace_cpu(seconds: float) -> bytes:
+    """Deterministic profile of the event loop thread, as a pstats file."""
+    async with _exclusive():
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
+
+
+def pstats_summary(data: bytes, limit: int = 50) -> str:
+    """Human-readable cumulative-time summary of a pstats file."""
+    stream = io.StringIO()
+    stats = pstats.Stats(_StatsSource(marshal.loads(data)), stream=stream)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+class _StatsSource:
+    """Adapter so pstats.Stats can load an in-memory stats dict."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+async def trace_memory(seconds: float, limit: int = 50, frames: int = 5) -> str:
+    """Top allocation sites by growth over the window (tracemalloc)."""
+    async with _exclusive():
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(frames)
+        try:
+            before = tracemalloc.take_snapshot()
+            await asyncio.sleep(seconds)
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ]
+    diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "traceback")
+    lines = [f"# traced memory: current={current} bytes peak={peak} bytes window={seconds}s"]
+    for stat in diff[:limit]:
+        lines.append(
+            f"{stat.size_diff:+d} bytes ({stat.count_diff:+d} blocks), "
+            f"now {stat.size} bytes in {stat.count} blocks"
+        )
+        lines.extend(f"    {line}" for line in stat.traceback.format())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,199 @@
+"""
+Opt-in OpenTelemetry tracing for Clankerbot.
+
+Enabled with TRACING_ENABLED=true. Requires `opentelemetry-sdk`; the OTLP
+exporter additionally needs `opentelemetry-exporter-otlp-proto-http`.
+Spans go to OTEL_EXPORTER_OTLP_ENDPOINT when it is set, otherwise to the
+console, or to TRACING_FILE_PATH (one JSON span per line) with
+TRACING_EXPORTER=file. When tracing is off every helper here is a no-op.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from app.config import settings
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # pragma: no cover - opentelemetry-api is optional
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+_provider = None
+_tracer = None
+
+
+def tracing_enabled() -> bool:
+    """Return True once setup_tracing() has installed a tracer provider."""
+    return _tracer is not None
+
+
+def _create_exporter(name: str):
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning(
+                "TRACING_EXPORTER=otlp but 'opentelemetry-exporter-otlp-proto-http' "
+                "is not installed, using console"
+            )
+            return ConsoleSpanExporter()
+        endpoint = (settings.OTEL_EXPORTER_OTLP_ENDPOINT or "").rstrip("/")
+        return OTLPSpanExporter(endpoint=f"{endpoint}/v1/traces" if endpoint else None)
+    if name == "file":
+
+        class FileSpanExporter(ConsoleSpanExporter):
+            """Console exporter writing JSON lines to a file it closes on shutdown."""
+
+            def __init__(self, path: str):
+                self.file = open(path, "a", encoding="utf-8")  # noqa: SIM115 - closed in shutdown()
+                super().__init__(
+                    out=self.file, formatter=lambda span: span.to_json(indent=None) + "\n"
+                )
+
+            def shutdown(self) -> None:
+                super().shutdown()
+                self.file.close()
+
+        return FileSpanExporter(settings.TRACING_FILE_PATH)
+    return ConsoleSpanExporter()
+
+
+def setup_tracing(exporter: Any = None) -> None:
+    """
+    Install a tracer provider if TRACING_ENABLED is set.
+
+    Args:
+        exporter: SpanExporter to use instead of the configured one (tests);
+            its spans are exported synchronously.
+    """
+    global _provider, _tracer
+    if not settings.TRACING_ENABLED or _tracer is not None:
+        return
+    if trace is None:
+        logger.warning("TRACING_ENABLED but 'opentelemetry-api' is not installed")
+        return
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError:
+        logger.warning("TRACING_ENABLED but 'opentelemetry-sdk' is not installed")
+        return
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": "clankerbot"}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATE)),
+    )
+    if exporter is not None:
+        _provider.add_span_processor(SimpleSpanProcessor(exporter))
+    else:
+        name = settings.TRACING_EXPORTER or (
+            "otlp" if settings.OTEL_EXPORTER_OTLP_ENDPOINT else "console"
+        )
+        _provider.add_span_processor(BatchSpanProcessor(_create_exporter(name)))
+        logger.info(f"Tracing enabled ({name} exporter)")
+    _tracer = _provider.get_tracer("clankerbot")
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and stop the exporter."""
+    global _provider, _tracer
+    if _provider is not None:
+        _provider.shutdown()
+    _provider = None
+    _tracer = None
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: dict[str, Any] | None = None,
+    kind: Any = None,
+    context: Any = None,
+) -> Iterator[Any]:
+    """Start a span as the current span; yields None when tracing is off."""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(
+        name,
+        context=context,
+        kind=kind if kind is not None else SpanKind.INTERNAL,
+        attributes=attributes,
+    ) as span:
+        yield span
+
+
+def traced(name: str) -> Callable:
+    """Decorator running an async function inside a span."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return await fn(*args, **kwargs)
+            with start_span(name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Set attributes on the current span, if tracing."""
+    if _tracer is None:
+        return
+    span = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            span.set_attribute(key, value)
+
+
+def extract_context(headers: dict[str, str]) -> Any:
+    """Parent context from incoming W3C traceparent headers (None if off)."""
+    if _tracer is None:
+        return None
+    return propagate.extract(headers)
+
+
+def mark_error(span: Any, message: str) -> None:
+    """Flag a span as failed."""
+    if span is not None:
+        span.set_status(Status(StatusCode.ERROR, message))
+
+
+def traced_middleware(cls: type) -> type:
+    """
+    Return a subclass of an ASGI middleware class whose calls run inside a
+    "middleware <Name>" span, or the class itself when tracing is off.
+    """
+    if _tracer is None:
+        return cls
+
+    class Traced(cls):
+        async def __call__(self, scope, receive, send):
+            if scope["type"] != "http":
+                await super().__call__(scope, receive, send)
+                return
+            with start_span(f"middleware {cls.__name__}"):
+                await super().__call__(scope, receive, send)
+
+    Traced.__name__ = Traced.__qualname__ = cls.__name__
+    return Traced
+
+
+# Span kinds re-exported for callers that should not import opentelemetry
+CLIENT = SpanKind.CLIENT if trace is not None else None
+SERVER = SpanKind.SERVER if trace is not None else None
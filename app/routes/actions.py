@@ -1,13 +1,107 @@
+import asyncio
+import logging
+from typing import Any
 
 from fastapi import APIRouter, Query, Request
-from app.models import HumanCommand, RunActionRequest, ScheduleRequest, ApiResponse
+
+from app import scheduler as sched
 from app.actions import parse_human, parse_with_llm
+from app.config import settings
 from app.integrations.base import get_integration
+from app.models import (
+    ApiResponse,
+    HumanCommand,
+    RunActionRequest,
+    RunBatchRequest,
+    ScheduleRequest,
+)
+from app.observability.tracing import start_span
 from app.utils.ids import request_id as get_request_id
-from app import scheduler as sched
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Per-integration batch limits, shared by every batch in this process.
+# Rebuilt when the spec changes or a new event loop is running.
+_integration_limits: dict[str, asyncio.Semaphore] = {}
+_integration_limits_key: tuple[str, asyncio.AbstractEventLoop] | None = None
+
+
+def _parse_integration_limits(spec: str) -> dict[str, int]:
+    """
+    Parse per-integration concurrency limits.
+
+    Args:
+        spec: Comma-separated name=limit pairs (e.g., "clockify=5,slack=2")
+
+    Returns:
+        Mapping of integration name to max concurrent executions
+    """
+    limits: dict[str, int] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, value = item.partition("=")
+        try:
+            limit = int(value)
+        except ValueError:
+            logger.warning(f"Invalid integration concurrency limit: {item}")
+            continue
+        if limit > 0:
+            limits[name.strip()] = limit
+    return limits
+
+
+def _get_integration_limits() -> dict[str, asyncio.Semaphore]:
+    """Process-wide semaphores for BATCH_INTEGRATION_CONCURRENCY."""
+    global _integration_limits, _integration_limits_key
+    key = (settings.BATCH_INTEGRATION_CONCURRENCY, asyncio.get_running_loop())
+    if key != _integration_limits_key:
+        _integration_limits = {
+            name: asyncio.Semaphore(limit)
+            for name, limit in _parse_integration_limits(key[0]).items()
+        }
+        _integration_limits_key = key
+    return _integration_limits
+
+
+async def _execute_action(req: RunActionRequest, req_id: str) -> dict[str, Any] | ApiResponse:
+    """Execute a single action, mapping errors to the standard envelope."""
+    try:
+        integ = get_integration(req.integration)
+        with start_span(
+            "integration.execute",
+            attributes={
+                "integration": req.integration,
+                "operation": req.operation,
+                "request.id": req_id,
+            },
+        ):
+            result = await integ.execute(req.operation, req.params)
+
+        # Integrations already return structured responses
+        # Wrap in ApiResponse if needed
+        if isinstance(result, dict) and "ok" in result:
+            # Already structured, add request ID
+            result["requestId"] = req_id
+            return result
+        else:
+            return ApiResponse.success(data=result, request_id=req_id)
+
+    except ValueError as e:
+        return ApiResponse.failure(
+            code="not_found",
+            message=str(e),
+            request_id=req_id,
+        )
+    except Exception as e:
+        return ApiResponse.failure(
+            code="internal_error",
+            message=str(e),
+            request_id=req_id,
+        )
+
 
 @router.post("/actions/parse")
 async def parse(request: Request, cmd: HumanCommand, llm: bool = Query(False)):
@@ -36,33 +130,62 @@ async def parse(request: Request, cmd: HumanCommand, llm: bool = Query(False)):
 async def run_action(request: Request, req: RunActionRequest):
     """Execute an action via integration."""
     req_id = get_request_id(request.headers.get("x-request-id"))
+    return await _execute_action(req, req_id)
 
-    try:
-        integ = get_integration(req.integration)
-        result = await integ.execute(req.operation, req.params)
 
-        # Integrations already return structured responses
-        # Wrap in ApiResponse if needed
-        if isinstance(result, dict) and "ok" in result:
-            # Already structured, add request ID
-            result["requestId"] = req_id
-            return result
-        else:
-            return ApiResponse.success(data=result, request_id=req_id)
+@router.post("/actions/run/batch")
+async def run_action_batch(request: Request, req: RunBatchRequest):
+    """
+    Execute multiple actions concurrently.
 
-    except ValueError as e:
-        return ApiResponse.failure(
-            code="not_found",
-            message=str(e),
-            request_id=req_id,
-        )
-    except Exception as e:
+    Concurrency is capped per request by BATCH_MAX_CONCURRENCY (or the
+    lower per-request `concurrency`), and per integration across all
+    batches in the process by BATCH_INTEGRATION_CONCURRENCY.
+    Results are returned in request order; one failing action does not
+    fail the batch.
+    """
+    req_id = get_request_id(request.headers.get("x-request-id"))
+
+    if len(req.actions) > settings.BATCH_MAX_ACTIONS:
         return ApiResponse.failure(
-            code="internal_error",
-            message=str(e),
+            code="validation_error",
+            message=f"Too many actions in batch. Maximum is {settings.BATCH_MAX_ACTIONS}",
             request_id=req_id,
         )
 
+    concurrency = settings.BATCH_MAX_CONCURRENCY
+    if req.concurrency is not None:
+        concurrency = min(concurrency, req.concurrency)
+    global_limit = asyncio.Semaphore(max(1, concurrency))
+    integration_limits = _get_integration_limits()
+
+    async def run_one(action: RunActionRequest) -> dict[str, Any]:
+        # Take the integration slot first so actions waiting on a saturated
+        # integration don't hold global slots other integrations could use
+        integration_limit = integration_limits.get(action.integration)
+        if integration_limit is None:
+            async with global_limit:
+                result = await _execute_action(action, req_id)
+        else:
+            async with integration_limit, global_limit:
+                result = await _execute_action(action, req_id)
+        if isinstance(result, ApiResponse):
+            result = result.model_dump()
+        result.pop("requestId", None)
+        return result
+
+    results = await asyncio.gather(*(run_one(a) for a in req.actions))
+    succeeded = sum(1 for r in results if r.get("ok"))
+
+    return ApiResponse.success(
+        data={
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+        },
+        request_id=req_id,
+    )
+
 
 @router.post("/schedules")
 async def create_schedule(request: Request, req: ScheduleRequest):
@@ -1,41 +1,42 @@
 """
 Dedicated Clockify webhook router with validation, idempotency, and normalization.
 """
-from fastapi import APIRouter, Request, Header
-from typing import Optional, Dict, Any
-from collections import OrderedDict
+
 import logging
-import ipaddress
-from app.models import ApiResponse
+import time
+from typing import Any
+
+from fastapi import APIRouter, Header, Request
+
 from app.config import settings
+from app.idempotency import IdempotencyStore, create_idempotency_store
+from app.integrations.base import get_integration
+from app.integrations.clockify_events import classify_event
+from app.models import ApiResponse
+from app.observability.metrics import webhook_duplicates_total, webhook_stage_duration_seconds
+from app.utils.allowlist import IPAllowlist
 from app.utils.ids import request_id as get_request_id
+from app.utils.jsonlib import FastJSONResponse, loads
+from app.webhook_queue import WebhookQueue
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# In-memory LRU cache for webhook event IDs (idempotency)
-# In production, consider Redis or similar
-MAX_EVENT_CACHE = 1000
-_event_cache: OrderedDict[str, bool] = OrderedDict()
+# Duplicate suppression for X-Clockify-Event-Id (see IDEMPOTENCY_BACKEND)
+_event_store: IdempotencyStore = create_idempotency_store()
 
 
-def _check_and_record_event(event_id: str) -> bool:
+async def _check_and_record_event(event_id: str) -> bool:
     """
     Check if event has been seen before and record it.
     Returns True if duplicate, False if new.
     """
-    global _event_cache
-    if event_id in _event_cache:
-        return True
-
-    # Add to cache
-    _event_cache[event_id] = True
+    return await _event_store.check_and_record(event_id)
 
-    # Evict oldest if cache is full
-    if len(_event_cache) > MAX_EVENT_CACHE:
-        _event_cache.popitem(last=False)
 
-    return False
+async def _forget_event(event_id: str) -> None:
+    """Remove a recorded event ID so a redelivery is processed again."""
+    await _event_store.discard(event_id)
 
 
 def _get_client_ip(request: Request) -> str:
@@ -62,6 +63,18 @@ def _get_client_ip(request: Request) -> str:
     return "unknown"
 
 
+# Compiled allowlist, rebuilt only when WEBHOOK_IP_ALLOWLIST changes
+_compiled_allowlist: IPAllowlist | None = None
+
+
+def _get_allowlist(allowlist: str) -> IPAllowlist:
+    """Return the compiled allowlist for a spec, recompiling on change."""
+    global _compiled_allowlist
+    if _compiled_allowlist is None or _compiled_allowlist.spec != allowlist:
+        _compiled_allowlist = IPAllowlist(allowlist)
+    return _compiled_allowlist
+
+
 def _validate_ip_allowlist(client_ip: str, allowlist: str) -> bool:
     """
     Validate if client IP is in the CIDR allowlist.
@@ -77,86 +90,103 @@ def _validate_ip_allowlist(client_ip: str, allowlist: str) -> bool:
         # No allowlist configured, allow all
         return True
 
-    try:
-        client_addr = ipaddress.ip_address(client_ip)
-    except ValueError:
-        logger.warning(f"Invalid client IP address: {client_ip}")
-        return False
-
-    # Parse CIDR ranges
-    allowed_networks = []
-    for cidr in allowlist.split(","):
-        cidr = cidr.strip()
-        if not cidr:
-            continue
-        try:
-            network = ipaddress.ip_network(cidr, strict=False)
-            allowed_networks.append(network)
-        except ValueError:
-            logger.warning(f"Invalid CIDR in allowlist: {cidr}")
-            continue
-
-    # Check if client IP is in any allowed network
-    for network in allowed_networks:
-        if client_addr in network:
-            return True
-
-    return False
-
-
-def _normalize_clockify_event(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return _get_allowlist(allowlist).allows(client_ip)
+
+
+# Compile the configured allowlist at startup rather than on the first delivery
+if settings.WEBHOOK_IP_ALLOWLIST:
+    _get_allowlist(settings.WEBHOOK_IP_ALLOWLIST)
+
+
+def _normalize_clockify_event(
+    payload: dict[str, Any], event_header: str | None = None
+) -> dict[str, Any]:
     """
     Normalize Clockify webhook payload to a standard event format.
+    The event type comes from the Clockify-Webhook-Event-Type header when
+    known, else from the payload shape (see app.integrations.clockify_events);
+    the header itself is passed through as clockifyEvent.
     """
-    # Try to infer event type from payload structure
-    event_type = "UNKNOWN"
+    return {
+        "eventType": classify_event(payload, event_header),
+        "clockifyEvent": event_header,
+        "id": payload.get("id"),
+        "workspaceId": payload.get("workspaceId"),
+        "userId": payload.get("userId"),
+        "rawPayload": payload,
+    }
 
-    # Time entry events
-    if "timeInterval" in payload and "userId" in payload:
-        if payload.get("timeInterval", {}).get("end") is None:
-            event_type = "NEW_TIMER_STARTED"
-        else:
-            event_type = "TIME_ENTRY"
 
-    # Project events
-    elif "name" in payload and "tasks" in payload and "workspaceId" in payload:
-        event_type = "PROJECT"
+# Normalized event types that make cached Clockify metadata stale
+_METADATA_EVENT_KINDS = {
+    "PROJECT": "projects",
+    "CLIENT": "clients",
+}
 
-    # Approval request events
-    elif "status" in payload and "owner" in payload and "dateRange" in payload:
-        event_type = "APPROVAL_REQUEST"
 
-    # Client events
-    elif "name" in payload and "archived" in payload and "tasks" not in payload:
-        event_type = "CLIENT"
+def _invalidate_cached_metadata(event: dict[str, Any]) -> None:
+    """Drop cached Clockify projects/clients affected by a webhook event."""
+    kind = _METADATA_EVENT_KINDS.get(event["eventType"])
+    workspace_id = event.get("workspaceId")
+    if not kind or not workspace_id:
+        return
+    try:
+        client = getattr(get_integration("clockify"), "client", None)
+    except ValueError:
+        return
+    if client:
+        client.invalidate_metadata(workspace_id, kind)
+        logger.debug(f"Invalidated cached Clockify {kind} for workspace {workspace_id}")
 
-    # Tag events
-    elif "name" in payload and "archived" in payload and "workspaceId" in payload and len(payload.keys()) <= 5:
-        event_type = "TAG"
 
-    # User events
-    elif "email" in payload and "settings" in payload:
-        event_type = "USER"
+async def _process_clockify_event(event: dict[str, Any]) -> None:
+    """Downstream processing for an accepted (non-duplicate) webhook event."""
+    _invalidate_cached_metadata(event)
+    logger.info(f"Processed Clockify webhook: type={event['eventType']}, id={event.get('id')}")
 
-    # Expense events
-    elif "categoryId" in payload and "quantity" in payload and "billable" in payload:
-        event_type = "EXPENSE"
 
-    return {
-        "eventType": event_type,
-        "id": payload.get("id"),
-        "workspaceId": payload.get("workspaceId"),
-        "userId": payload.get("userId"),
-        "rawPayload": payload,
-    }
+# Accepted events are processed by background workers started with the app
+ingest_queue = WebhookQueue(
+    "clockify_webhooks",
+    _process_clockify_event,
+    maxsize=settings.WEBHOOK_QUEUE_SIZE,
+    workers=settings.WEBHOOK_WORKERS,
+)
+
+
+class _StageTimer:
+    """
+    Durations of the clockify_webhook stages reached by one request,
+    observed together once the normalized event type is known.
+    """
+
+    __slots__ = ("_last", "event_type", "stages")
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.event_type = "UNKNOWN"
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """Record the time since the previous mark as `stage`."""
+        now = time.perf_counter()
+        self.stages[stage] = now - self._last
+        self._last = now
+
+    def observe(self) -> None:
+        for stage, seconds in self.stages.items():
+            webhook_stage_duration_seconds.labels(
+                service="clankerbot", stage=stage, event_type=self.event_type
+            ).observe(seconds)
 
 
 @router.post("/webhooks/clockify")
 async def clockify_webhook(
     request: Request,
-    x_webhook_secret: Optional[str] = Header(None),
-    x_clockify_event_id: Optional[str] = Header(None),
-    x_request_id: Optional[str] = Header(None),
+    x_webhook_secret: str | None = Header(None),
+    x_clockify_event_id: str | None = Header(None),
+    x_request_id: str | None = Header(None),
+    clockify_webhook_event_type: str | None = Header(None),
 ):
     """
     Receive and process Clockify webhooks with:
@@ -164,17 +194,38 @@ async def clockify_webhook(
     - Secret validation (if WEBHOOK_SHARED_SECRET is set)
     - Idempotency via X-Clockify-Event-Id
     - Event normalization
-    - Structured response
+    - Structured response, sent before downstream processing (queued)
+    - 503 + Retry-After when the processing queue is full
     """
     req_id = get_request_id(x_request_id)
+    timer = _StageTimer()
+    try:
+        return await _handle_clockify_webhook(
+            request,
+            x_webhook_secret,
+            x_clockify_event_id,
+            clockify_webhook_event_type,
+            req_id,
+            timer,
+        )
+    finally:
+        timer.observe()
+
 
+async def _handle_clockify_webhook(
+    request: Request,
+    x_webhook_secret: str | None,
+    x_clockify_event_id: str | None,
+    event_header: str | None,
+    req_id: str,
+    timer: "_StageTimer",
+):
+    """Body of clockify_webhook, marking each stage it completes on `timer`."""
     # Validate IP allowlist if configured
     if settings.WEBHOOK_IP_ALLOWLIST:
         client_ip = _get_client_ip(request)
         if not _validate_ip_allowlist(client_ip, settings.WEBHOOK_IP_ALLOWLIST):
-            logger.warning(
-                f"Webhook from unauthorized IP {client_ip} blocked (request {req_id})"
-            )
+            logger.warning(f"Webhook from unauthorized IP {client_ip} blocked (request {req_id})")
             return ApiResponse.failure(
                 code="forbidden",
                 message=f"IP address {client_ip} not in allowlist",
@@ -200,9 +251,11 @@ async def clockify_webhook(
                 request_id=req_id,
             )
 
+    timer.mark("auth")
+
     # Parse payload
     try:
-        payload = await request.json()
+        payload = loads(await request.body())
     except Exception as e:
         logger.error(f"Failed to parse webhook payload: {e}")
         return ApiResponse.failure(
@@ -210,19 +263,20 @@ async def clockify_webhook(
             message="Invalid JSON payload",
             request_id=req_id,
         )
+    timer.mark("parse")
 
     # Check idempotency
     is_duplicate = False
     if x_clockify_event_id:
-        is_duplicate = _check_and_record_event(x_clockify_event_id)
+        is_duplicate = await _check_and_record_event(x_clockify_event_id)
         if is_duplicate:
-            logger.info(
-                f"Duplicate webhook event {x_clockify_event_id} in request {req_id}"
-            )
+            webhook_duplicates_total.labels(service="clankerbot").inc()
+            logger.info(f"Duplicate webhook event {x_clockify_event_id} in request {req_id}")
+    timer.mark("idempotency")
 
     # Normalize event
     try:
-        normalized = _normalize_clockify_event(payload)
+        normalized = _normalize_clockify_event(payload, event_header)
     except Exception as e:
         logger.error(f"Failed to normalize webhook: {e}")
         return ApiResponse.failure(
@@ -230,6 +284,24 @@ async def clockify_webhook(
             message="Failed to process webhook",
             request_id=req_id,
         )
+    timer.mark("normalize")
+    timer.event_type = normalized["eventType"]
+
+    # Hand off downstream processing so the delivery is acknowledged immediately
+    if not is_duplicate and not await ingest_queue.submit(normalized):
+        if x_clockify_event_id:
+            # Let Clockify's redelivery through instead of flagging it duplicate
+            await _forget_event(x_clockify_event_id)
+        logger.warning(f"Webhook queue full, rejecting request {req_id}")
+        return FastJSONResponse(
+            status_code=503,
+            headers={"Retry-After": str(settings.WEBHOOK_QUEUE_RETRY_AFTER_SECONDS)},
+            content=ApiResponse.failure(
+                code="unavailable",
+                message="Webhook queue is full, retry later",
+                request_id=req_id,
+            ),
+        )
 
     # Build response
     response_data = {
@@ -240,8 +312,10 @@ async def clockify_webhook(
     }
 
     logger.info(
-        f"Processed Clockify webhook: type={normalized['eventType']}, "
+        f"Accepted Clockify webhook: type={normalized['eventType']}, "
         f"id={normalized.get('id')}, duplicate={is_duplicate}"
     )
 
-    return ApiResponse.success(data=response_data, request_id=req_id)
+    # Render directly; the echoed payload can be large and skipping
+    # jsonable_encoder avoids walking it in Python
+    return FastJSONResponse(ApiResponse.success(data=response_data, request_id=req_id))
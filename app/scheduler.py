@@ -1,14 +1,21 @@
+from typing import Any
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from typing import Dict, Any
+
 from .integrations.base import get_integration
+from .observability.tracing import start_span
 
 scheduler: AsyncIOScheduler | None = None
 
-async def _job(integration: str, operation: str, params: Dict[str, Any]):
-    integ = get_integration(integration)
-    await integ.execute(operation, params)
+
+async def _job(integration: str, operation: str, params: dict[str, Any]):
+    attributes = {"integration": integration, "operation": operation}
+    with start_span("scheduler.job", attributes=attributes):
+        integ = get_integration(integration)
+        with start_span("integration.execute", attributes=attributes):
+            await integ.execute(operation, params)
+
 
 def start_scheduler() -> AsyncIOScheduler:
     global scheduler
@@ -17,7 +24,10 @@ def start_scheduler() -> AsyncIOScheduler:
         scheduler.start()
     return scheduler
 
-def schedule_action(integration: str, operation: str, params: Dict[str, Any], cron: Dict[str, str]):
+
+def schedule_action(integration: str, operation: str, params: dict[str, Any], cron: dict[str, str]):
     s = start_scheduler()
     trigger = CronTrigger(**{k: v for k, v in cron.items() if v is not None})
-    s.add_job(_job, trigger, kwargs=dict(integration=integration, operation=operation, params=params))
+    s.add_job(
+        _job, trigger, kwargs=dict(integration=integration, operation=operation, params=params)
+    )
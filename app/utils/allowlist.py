@@ -0,0 +1,64 @@
+"""
+Compiled CIDR allowlist with O(log n) address lookups.
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import logging
+from bisect import bisect_right
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+class IPAllowlist:
+    """
+    CIDR allowlist compiled into sorted, merged address intervals per IP version.
+
+    Lookups binary-search the intervals and per-IP decisions are memoized.
+    IPv4-mapped IPv6 addresses (::ffff:a.b.c.d) are checked as IPv4.
+    """
+
+    def __init__(self, spec: str, decision_cache_size: int = 4096):
+        self.spec = spec
+        self._starts: dict[int, list[int]] = {}
+        self._ends: dict[int, list[int]] = {}
+        self._compile(spec)
+        self.allows = lru_cache(maxsize=decision_cache_size)(self._lookup)
+
+    def _compile(self, spec: str) -> None:
+        networks: dict[int, list] = {4: [], 6: []}
+        for cidr in spec.split(","):
+            cidr = cidr.strip()
+            if not cidr:
+                continue
+            try:
+                network = ipaddress.ip_network(cidr, strict=False)
+            except ValueError:
+                logger.warning(f"Invalid CIDR in allowlist: {cidr}")
+                continue
+            networks[network.version].append(network)
+
+        for version, nets in networks.items():
+            # collapse_addresses merges overlapping/adjacent ranges and sorts them
+            intervals: list[tuple[int, int]] = [
+                (int(n.network_address), int(n.broadcast_address))
+                for n in ipaddress.collapse_addresses(nets)
+            ]
+            self._starts[version] = [start for start, _ in intervals]
+            self._ends[version] = [end for _, end in intervals]
+
+    def _lookup(self, client_ip: str) -> bool:
+        try:
+            addr = ipaddress.ip_address(client_ip)
+        except ValueError:
+            logger.warning(f"Invalid client IP address: {client_ip}")
+            return False
+        if addr.version == 6 and addr.ipv4_mapped is not None:
+            addr = addr.ipv4_mapped
+
+        value = int(addr)
+        starts = self._starts[addr.version]
+        i = bisect_right(starts, value) - 1
+        return i >= 0 and value <= self._ends[addr.version][i]
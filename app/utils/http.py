@@ -1,20 +1,41 @@
 """
 HTTP client utilities with sane defaults for clankerbot.
 """
+
 from __future__ import annotations
+
+import importlib.util
+import logging
+from collections.abc import Callable
+
 import httpx
 
+from app.observability.outbound import InstrumentedTransport
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    """Return True if the optional `h2` package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
 
 def create_http_client(
     timeout: float = 20.0,
     user_agent: str = "clankerbot/0.2",
-    **kwargs
+    limits: httpx.Limits | None = None,
+    http2: bool = False,
+    upstream: str | None = None,
+    **kwargs,
 ) -> httpx.AsyncClient:
     """
     Create a configured async HTTP client with:
     - Sane timeout defaults (20s)
     - Custom user-agent
+    - Connection pool limits and keep-alive (reused across requests)
+    - Optional HTTP/2 (falls back to HTTP/1.1 if `h2` is not installed)
     - Retry transport for idempotent methods (GET, HEAD, OPTIONS, etc.)
+    - Outbound metrics labelled with `upstream`, when given
     """
     headers = kwargs.pop("headers", {})
     headers.setdefault("User-Agent", user_agent)
@@ -24,11 +45,44 @@ def create_http_client(
 
     # Create transport with retry logic for network errors
     # Note: httpx doesn't have built-in retry, we handle it at call level
-    transport = httpx.AsyncHTTPTransport(retries=0)  # We handle retries manually
-
-    return httpx.AsyncClient(
-        timeout=timeout_config,
-        headers=headers,
-        transport=transport,
-        **kwargs
-    )
+    if http2 and not http2_available():
+        logger.warning("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+        http2 = False
+
+    transport_kwargs = {"retries": 0, "http2": http2}  # We handle retries manually
+    if limits is not None:
+        transport_kwargs["limits"] = limits
+    transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+    if upstream:
+        transport = InstrumentedTransport(transport, upstream)
+
+    return httpx.AsyncClient(timeout=timeout_config, headers=headers, transport=transport, **kwargs)
+
+
+class PooledClient:
+    """
+    Shared HTTP client for one upstream, created on first use by `factory`
+    (usually a create_http_client call) and recreated if it was closed.
+    Connections are kept alive and reused until aclose().
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncClient]):
+        self._factory = factory
+        self._http: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient | None:
+        """The open client, or None before first use and after aclose()."""
+        return self._http
+
+    def open(self) -> httpx.AsyncClient:
+        """Return the pooled client, creating it on first use."""
+        if self._http is None or self._http.is_closed:
+            self._http = self._factory()
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the pooled client and release its connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
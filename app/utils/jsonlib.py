@@ -0,0 +1,94 @@
+"""
+JSON encoding/decoding with an optional fast backend.
+
+Uses orjson when it is installed (`pip install orjson`) and falls back to the
+stdlib json module otherwise. Select with JSON_BACKEND (auto, orjson, json).
+"""
+
+import importlib.util
+import json
+import logging
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def orjson_available() -> bool:
+    """Return True if the optional `orjson` package is installed."""
+    return importlib.util.find_spec("orjson") is not None
+
+
+def _select_backend(name: str) -> str:
+    name = (name or "auto").strip().lower()
+    if name == "json":
+        return "json"
+    if orjson_available():
+        return "orjson"
+    if name == "orjson":
+        logger.warning("JSON_BACKEND=orjson but 'orjson' is not installed, using json")
+    return "json"
+
+
+BACKEND = _select_backend(settings.JSON_BACKEND)
+
+if BACKEND == "orjson":
+    import orjson
+
+# orjson decodes integers outside the 64-bit range as floats. Any such
+# integer has at least 19 digits, so documents with a run that long are
+# decoded by stdlib instead (rare; long digit runs in strings also match).
+# Mapping every digit to "0" and searching for the run is a few times
+# cheaper than a regex scan.
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_LONG_DIGIT_RUN = b"0" * 19
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types neither backend handles natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    # Same output settings as starlette's JSONResponse
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes."""
+    if BACKEND == "orjson":
+        try:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson rejects e.g. integers wider than 64 bits; stdlib does not
+            pass
+    return _stdlib_dumps(obj)
+
+
+def loads(data: Any) -> Any:
+    """Deserialize JSON from bytes or str; integers keep full precision."""
+    if BACKEND == "orjson":
+        raw = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        if _LONG_DIGIT_RUN not in raw.translate(_DIGITS_TO_ZERO):
+            return orjson.loads(raw)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the selected backend; accepts pydantic models."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,19 +1,28 @@
 """
-Logging configuration with optional JSON output.
+Logging configuration with optional JSON output and queued (non-blocking)
+writes.
 """
+
+import atexit
+import copy
 import logging
-import sys
-import json
+import logging.handlers
 import os
+import queue
+import sys
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any
+
+from app.config import settings
+from app.observability.metrics import log_records_dropped_total
+from app.utils.jsonlib import dumps
 
 
 class JSONFormatter(logging.Formatter):
     """JSON log formatter."""
 
     def format(self, record: logging.LogRecord) -> str:
-        log_obj: Dict[str, Any] = {
+        log_obj: dict[str, Any] = {
             "ts": datetime.utcnow().isoformat() + "Z",
             "level": record.levelname,
             "msg": record.getMessage(),
@@ -34,15 +43,131 @@ class JSONFormatter(logging.Formatter):
         # Add exception info if present
         if record.exc_info:
             log_obj["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_obj["exc_info"] = record.exc_text
+
+        return dumps(log_obj).decode("utf-8")
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a bounded queue that drops records instead of blocking
+    when the queue is full, counting them in `dropped` and
+    log_records_dropped_total.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.dropped = 0
+        self._exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Resolve the message and traceback on the calling thread (args and
+        exc_info may not be safe to use later) but leave formatting to the
+        listener's handler, keeping extra fields for JSONFormatter.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.count_dropped()
 
-        return json.dumps(log_obj)
+    def count_dropped(self) -> None:
+        self.dropped += 1
+        log_records_dropped_total.labels(service="clankerbot").inc()
+
+
+class DroppingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener for a DroppingQueueHandler whose stop() cannot fail on a
+    full queue: the stop sentinel waits up to sentinel_timeout seconds for
+    room, then replaces the oldest queued record (counted as dropped).
+    """
+
+    def __init__(
+        self,
+        queue_handler: DroppingQueueHandler,
+        *handlers: logging.Handler,
+        respect_handler_level: bool = False,
+        sentinel_timeout: float = 1.0,
+    ):
+        super().__init__(
+            queue_handler.queue, *handlers, respect_handler_level=respect_handler_level
+        )
+        self.queue_handler = queue_handler
+        self.sentinel_timeout = sentinel_timeout
+
+    def enqueue_sentinel(self) -> None:
+        try:
+            self.queue.put(self._sentinel, timeout=self.sentinel_timeout)
+            return
+        except queue.Full:
+            pass
+        while True:
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.queue_handler.count_dropped()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(self._sentinel)
+                return
+            except queue.Full:
+                continue
+
+
+# Background writer for LOG_QUEUE mode
+_listener: DroppingQueueListener | None = None
+
+
+def stop_log_listener() -> None:
+    """Flush queued records and stop the background log writer, if running."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    try:
+        listener.stop()
+    finally:
+        # Later records (e.g. server shutdown) are written directly again
+        root = logging.getLogger()
+        if listener.queue_handler in root.handlers:
+            root.removeHandler(listener.queue_handler)
+            for handler in listener.handlers:
+                root.addHandler(handler)
+    dropped = listener.queue_handler.dropped
+    if dropped:
+        for handler in listener.handlers:
+            handler.handle(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"Log queue dropped {dropped} records",
+                    }
+                )
+            )
 
 
 def configure_logging(level: int = logging.INFO) -> None:
     """
     Configure logging with optional JSON format.
     Set LOG_JSON=true in env to enable JSON logging.
+    Set LOG_QUEUE=true to hand records to a bounded queue drained by a
+    background thread, so a slow stdout never blocks the event loop.
     """
+    global _listener
     use_json = os.getenv("LOG_JSON", "").lower() in ("true", "1", "yes")
 
     handler = logging.StreamHandler(sys.stdout)
@@ -50,9 +175,14 @@ def configure_logging(level: int = logging.INFO) -> None:
     if use_json:
         handler.setFormatter(JSONFormatter())
     else:
-        handler.setFormatter(
-            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
-        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    if settings.LOG_QUEUE and _listener is None:
+        queue_handler = DroppingQueueHandler(settings.LOG_QUEUE_SIZE)
+        _listener = DroppingQueueListener(queue_handler, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_log_listener)
+        handler = queue_handler
 
     logging.basicConfig(
         level=level,
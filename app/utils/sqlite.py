@@ -0,0 +1,67 @@
+"""
+SQLite database shared by every worker process on a host.
+
+Used by the stores that must agree across uvicorn workers (idempotency,
+rate limit buckets). The connection is opened in WAL mode and shared by
+threads behind a lock; callers run their queries through run() so the
+event loop never blocks on disk I/O.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SQLiteDatabase:
+    """Thread-safe SQLite connection with IMMEDIATE write transactions."""
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Hold the write lock for a block of statements, committed together.
+        IMMEDIATE takes the database write lock up front so concurrent
+        read-modify-write transactions from other processes serialize.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """Run a single statement in its own (autocommit) transaction."""
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def count_write(self, every: int) -> bool:
+        """Count a write; True on every `every`-th one (for periodic pruning)."""
+        self._writes += 1
+        return self._writes % every == 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a blocking database function in a worker thread."""
+        return await asyncio.to_thread(fn, *args)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,40 @@
+"""
+Client-side throttling for outbound API calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.middleware.ratelimit import TokenBucket
+
+
+class OutboundThrottle:
+    """
+    Token bucket that makes callers wait (FIFO) instead of rejecting them.
+
+    Keeps outbound traffic under an upstream's rate limit and lets a
+    Retry-After from the upstream pause every caller sharing the throttle.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.bucket = TokenBucket(capacity=burst, refill_rate=rate_per_second, burst=burst)
+        self.blocked_until = 0.0  # wall clock, same as TokenBucket
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Wait for a token. Returns the number of seconds spent waiting."""
+        start = time.time()
+        async with self._lock:
+            while True:
+                wait = self.blocked_until - time.time()
+                if wait <= 0:
+                    if self.bucket.consume():
+                        return time.time() - start
+                    wait = self.bucket.time_until()
+                await asyncio.sleep(wait)
+
+    def block_for(self, seconds: float) -> None:
+        """Hold all callers for `seconds` (e.g. from an upstream Retry-After)."""
+        self.blocked_until = max(self.blocked_until, time.time() + seconds)
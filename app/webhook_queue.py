@@ -0,0 +1,108 @@
+"""
+In-process bounded queue and worker pool for webhook processing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.observability.metrics import (
+    webhook_queue_depth,
+    webhook_queue_latency_seconds,
+    webhook_queue_rejected_total,
+)
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class WebhookQueue:
+    """
+    Bounded queue drained by a pool of worker tasks.
+
+    Until start() is called (e.g. when the app lifespan is not running),
+    submitted events are processed inline so nothing is dropped.
+    """
+
+    def __init__(self, name: str, handler: Handler, maxsize: int, workers: int):
+        self.name = name
+        self.handler = handler
+        self.maxsize = maxsize
+        self.worker_count = workers
+        self._queue: asyncio.Queue[tuple[float, dict[str, Any]]] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """Start the worker pool."""
+        if self.running or self.worker_count <= 0:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info(f"Started {self.worker_count} {self.name} workers (queue size {self.maxsize})")
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Drain queued events (up to drain_timeout seconds) and stop the workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"{self.name} queue not drained after {drain_timeout}s, "
+                f"dropping {self._queue.qsize()} events"
+            )
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        webhook_queue_depth.labels(service="clankerbot", queue=self.name).set(0)
+
+    async def submit(self, event: dict[str, Any]) -> bool:
+        """
+        Queue an event for processing.
+        Returns False if the queue is full (caller should apply backpressure).
+        """
+        if not self.running:
+            await self._process(event)
+            return True
+        try:
+            self._queue.put_nowait((time.perf_counter(), event))
+        except asyncio.QueueFull:
+            webhook_queue_rejected_total.labels(service="clankerbot", queue=self.name).inc()
+            return False
+        webhook_queue_depth.labels(service="clankerbot", queue=self.name).set(self.depth())
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            enqueued_at, event = await self._queue.get()
+            try:
+                webhook_queue_depth.labels(service="clankerbot", queue=self.name).set(self.depth())
+                webhook_queue_latency_seconds.labels(service="clankerbot", queue=self.name).observe(
+                    time.perf_counter() - enqueued_at
+                )
+                await self._process(event)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, event: dict[str, Any]) -> None:
+        try:
+            await self.handler(event)
+        except Exception as e:
+            logger.error(f"{self.name} handler failed: {e}", exc_info=True)
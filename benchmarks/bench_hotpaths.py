@@ -0,0 +1,293 @@
+"""
+Micro benchmarks of request hot paths plus in-process webhook throughput.
+
+Absolute ops/s only mean something on the machine that measured them, so
+each benchmark is also timed against a fixed pure-Python reference
+workload, alternating with it in the same run; the ratio of the two
+largely cancels out CPU speed and load. The committed baseline stores
+those ratios, and a comparison exits non-zero when any benchmark's ratio
+is lower than the baseline's by more than --tolerance in a run and in a
+re-run of the regressed benchmarks.
+
+Usage:
+    python -m benchmarks.bench_hotpaths [--only NAME] [--quick]
+    python -m benchmarks.bench_hotpaths --save benchmarks/baseline.json
+    python -m benchmarks.bench_hotpaths --compare benchmarks/baseline.json
+"""
+import os
+
+# Never throttle or persist anything during the benchmark (read at import)
+os.environ["RATE_LIMIT_PER_MINUTE"] = str(10**9)
+os.environ["RATE_LIMIT_BURST"] = str(10**9)
+os.environ["RATE_LIMIT_BACKEND"] = "memory"
+os.environ["IDEMPOTENCY_BACKEND"] = "memory"
+os.environ["WEBHOOK_IP_ALLOWLIST"] = ""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+import respx
+
+from app.actions import parse_human
+from app.config import settings
+from app.main import app
+from app.middleware.ratelimit import TokenBucket
+from app.routes import webhooks_clockify
+from app.utils.ids import ulid
+
+SAMPLES_PATH = Path(__file__).resolve().parent.parent / "Clockify_Webhook_JSON_Samples.md"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# (name, ops per second, ops per second relative to the reference workload)
+Result = Tuple[str, float, float]
+
+# Reference calls per round (~10ms, about as long as one benchmark round)
+REFERENCE_NUMBER = 300
+
+
+def reference_workload() -> int:
+    """Fixed interpreter-bound work (dict, str and int ops) no app change affects."""
+    table = {}
+    for i in range(64):
+        table[f"k{i}"] = i * 3
+    return sum(v for k, v in table.items() if k.endswith("7"))
+
+
+def time_calls(fn: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def load_samples(path: Path = SAMPLES_PATH) -> Dict[str, Dict[str, Any]]:
+    """Webhook payloads from the samples file, keyed by section (event type)."""
+    text = path.read_text(encoding="utf-8")
+    samples = {}
+    for name, body in re.findall(r"^## (\w+)\s*\n```json\n(.*?)\n```", text, re.M | re.S):
+        samples[name] = json.loads(body)
+    return samples
+
+
+def relative_speed(elapsed: float, number: int, reference: float) -> float:
+    return (number / elapsed) / (REFERENCE_NUMBER / reference)
+
+
+def bench(name: str, fn: Callable[[], Any], number: int, repeat: int = 15) -> Result:
+    """
+    Time `repeat` rounds of calling fn `number` times, each preceded by a
+    round of the reference workload. Returns the best round's throughput
+    and the median of the per-round ratios, which short noisy stretches
+    (another process, a frequency change) do not skew.
+    """
+    rounds = []
+    for _ in range(repeat):
+        reference = time_calls(reference_workload, REFERENCE_NUMBER)
+        rounds.append((time_calls(fn, number), reference))
+    best = min(elapsed for elapsed, _ in rounds)
+    ratios = [relative_speed(elapsed, number, reference) for elapsed, reference in rounds]
+    return name, number / best, statistics.median(ratios)
+
+
+def bench_async(name: str, fn: Callable[[], Any], number: int, repeat: int = 15) -> Result:
+    """Like bench() for a coroutine function, timed inside one event loop."""
+
+    async def timed() -> List[Tuple[float, float]]:
+        rounds = []
+        for _ in range(repeat):
+            reference = time_calls(reference_workload, REFERENCE_NUMBER)
+            start = time.perf_counter()
+            for _ in range(number):
+                await fn()
+            rounds.append((time.perf_counter() - start, reference))
+        return rounds
+
+    rounds = asyncio.run(timed())
+    best = min(elapsed for elapsed, _ in rounds)
+    ratios = [relative_speed(elapsed, number, reference) for elapsed, reference in rounds]
+    return name, number / best, statistics.median(ratios)
+
+
+def micro_benchmarks(scale: float, selected: Callable[[str], bool]) -> List[Result]:
+    n = lambda count: max(1, int(count * scale))  # noqa: E731
+    results = []
+
+    def run(name: str, fn: Callable[[], Any], number: int, repeat: int = 15, runner=bench) -> None:
+        if selected(name):
+            results.append(runner(name, fn, n(number), repeat))
+
+    run("parse_human", lambda: parse_human("clockify.create_client workspaceId=ws1 name=Acme"), 10000)
+    run("ulid", ulid, 10000)
+
+    bucket = TokenBucket(capacity=10**9, refill_rate=10**9, burst=10**9)
+    run("TokenBucket.consume", bucket.consume, 50000)
+
+    allowlist = "10.0.0.0/8,192.168.0.0/16,172.16.0.0/12,2001:db8::/32"
+    hosts = [f"10.{i % 256}.{i // 256 % 256}.1" for i in range(1000)] + ["8.8.8.8"] * 100
+    index = iter(range(10**9))
+    run(
+        "_validate_ip_allowlist",
+        lambda: webhooks_clockify._validate_ip_allowlist(hosts[next(index) % len(hosts)], allowlist),
+        20000,
+    )
+
+    counter = iter(range(10**9))
+    run(
+        "_check_and_record_event",
+        lambda: webhooks_clockify._check_and_record_event(f"evt-{next(counter) % 5000}"),
+        10000,
+        runner=bench_async,
+    )
+
+    samples = sorted(load_samples().items())
+    for event, payload in samples:
+        run(
+            f"_normalize_clockify_event[{event}]",
+            lambda payload=payload: webhooks_clockify._normalize_clockify_event(payload),
+            5000,
+        )
+
+    # As delivered by Clockify, which always sends the event type header
+    deliveries = itertools.cycle([(payload, event) for event, payload in samples])
+    run(
+        "_normalize_clockify_event[all samples, event header]",
+        lambda: webhooks_clockify._normalize_clockify_event(*next(deliveries)),
+        50000,
+    )
+    return results
+
+
+async def webhook_throughput(requests: int, rounds: int = 15) -> Result:
+    """Requests per second through the full app for POST /webhooks/clockify."""
+    payloads = [
+        (name, json.dumps(payload).encode())
+        for name, payload in sorted(load_samples().items())
+    ]
+    transport = httpx.ASGITransport(app=app)
+    with respx.mock(assert_all_called=False, assert_all_mocked=False) as upstream:
+        # Processing must never reach a real upstream
+        upstream.route(host__regex=r".*clockify\.me").mock(return_value=httpx.Response(200, json=[]))
+        upstream.route(url__startswith=settings.LLM_BASE_URL).mock(return_value=httpx.Response(200, json={}))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def post(i: int) -> None:
+                name, body = payloads[i % len(payloads)]
+                response = await client.post(
+                    "/webhooks/clockify",
+                    content=body,
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-Clockify-Event-Id": f"bench-{ulid()}",
+                        "Clockify-Webhook-Event-Type": name,
+                    },
+                )
+                assert response.status_code == 200, response.text
+
+            for i in range(min(200, requests)):  # warm-up
+                await post(i)
+            # Rounds of requests alternating with the reference, as in bench()
+            per_round = max(1, requests // rounds)
+            total = 0.0
+            ratios = []
+            for r in range(rounds):
+                reference = time_calls(reference_workload, REFERENCE_NUMBER)
+                start = time.perf_counter()
+                for i in range(r * per_round, (r + 1) * per_round):
+                    await post(i)
+                elapsed = time.perf_counter() - start
+                total += elapsed
+                ratios.append(relative_speed(elapsed, per_round, reference))
+            ops = per_round * rounds / total
+            return "webhook_throughput", ops, statistics.median(ratios)
+
+
+def load_baseline(path: Path) -> Dict[str, float]:
+    """Relative results of a baseline file."""
+    if not path.exists():
+        sys.exit(f"No baseline at {path}; record one with --save {path}")
+    baseline = json.loads(path.read_text())
+    python = ".".join(platform.python_version_tuple()[:2])
+    if baseline.get("python") != python:
+        # The reference workload speeds up with the interpreter too, but not evenly
+        print(f"Baseline was recorded on Python {baseline.get('python')}, this is {python}")
+    return baseline["relative"]
+
+
+def run_benchmarks(scale: float, requests: int, selected: Callable[[str], bool]) -> List[Result]:
+    results = micro_benchmarks(scale, selected)
+    if selected("webhook_throughput"):
+        results.append(asyncio.run(webhook_throughput(max(100, int(requests * scale)))))
+    return results
+
+
+def compare(results: List[Result], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Print each result against the baseline; return the names that regressed."""
+    regressed = []
+    for name, ops, relative in results:
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:58s} {ops:14,.0f} ops/s {relative:10.4g}x ref  (no baseline)")
+            continue
+        change = relative / base - 1
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(
+            f"{name:58s} {ops:14,.0f} ops/s {relative:10.4g}x ref  "
+            f"{change:+7.1%} vs {base:.4g}x{flag}"
+        )
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", help="Run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="Run 10x fewer iterations")
+    parser.add_argument("--requests", type=int, default=2000, help="Webhook requests to send")
+    parser.add_argument("--save", type=Path, help="Write results to this baseline file")
+    parser.add_argument("--compare", type=Path, nargs="?", const=DEFAULT_BASELINE,
+                        help=f"Compare against a baseline (default {DEFAULT_BASELINE.name})")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown before failing a comparison (default 0.2)")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)  # measure code, not stdout
+    baseline = load_baseline(args.compare) if args.compare else None
+
+    scale = 0.1 if args.quick else 1.0
+    results = run_benchmarks(scale, args.requests, lambda name: (args.only or "") in name)
+
+    if baseline is not None:
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            # A noisy stretch can hit any entry once; a real regression repeats
+            print(f"\nRe-running {len(regressed)} regressed benchmark(s)")
+            retried = run_benchmarks(scale, args.requests, lambda name: name in regressed)
+            if compare(retried, baseline, args.tolerance):
+                sys.exit(1)
+    else:
+        for name, ops, relative in results:
+            print(f"{name:58s} {ops:14,.0f} ops/s {relative:10.4g}x ref")
+
+    if args.save:
+        baseline = {
+            "python": ".".join(platform.python_version_tuple()[:2]),
+            "relative": {name: round(relative, 4) for name, _, relative in results},
+        }
+        args.save.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Saved baseline to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compare request throughput of the pure ASGI middleware stack against the
+previous BaseHTTPMiddleware implementations.
+
+Usage:
+    python -m benchmarks.bench_middleware [--requests 5000]
+"""
+import argparse
+import asyncio
+import logging
+import time
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from app.main import RequestIDMiddleware
+from app.middleware.ratelimit import RateLimitMiddleware, TokenBucket
+from app.middleware.request_size import RequestSizeLimitMiddleware
+from app.utils.ids import request_id as get_request_id
+
+
+# Previous BaseHTTPMiddleware implementations, kept here as the baseline
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        req_id = get_request_id(request.headers.get("x-request-id"))
+        request.state.request_id = req_id
+        start_time = time.time()
+        logging.getLogger("app.main").info(
+            f"Request started: {request.method} {request.url.path}",
+            extra={"request_id": req_id, "path": request.url.path},
+        )
+        response = await call_next(request)
+        logging.getLogger("app.main").info(
+            f"Request completed: {request.method} {request.url.path} status={response.status_code}",
+            extra={"duration_ms": round((time.time() - start_time) * 1000, 2)},
+        )
+        response.headers["X-Request-ID"] = req_id
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, capacity: int = 60, burst: int = None):
+        super().__init__(app)
+        self.buckets = {}
+        self.capacity = capacity
+        self.burst = burst or capacity
+
+    async def dispatch(self, request: Request, call_next):
+        key = (request.client.host if request.client else "unknown", request.url.path)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.capacity, self.capacity / 60.0, self.burst)
+        if not bucket.consume():
+            return JSONResponse(status_code=429, content={"ok": False})
+        return await call_next(request)
+
+
+class LegacyRequestSizeLimitMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > 1024 * 1024:
+            return JSONResponse(status_code=413, content={"ok": False})
+        return await call_next(request)
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+    limit = 10**9  # never throttle during the benchmark
+    if legacy:
+        app.add_middleware(LegacyRequestIDMiddleware)
+        app.add_middleware(LegacyRateLimitMiddleware, capacity=limit, burst=limit)
+        app.add_middleware(LegacyRequestSizeLimitMiddleware)
+    else:
+        app.add_middleware(RequestIDMiddleware)
+        app.add_middleware(RateLimitMiddleware, capacity=limit, burst=limit)
+        app.add_middleware(RequestSizeLimitMiddleware)
+
+    @app.post("/ping")
+    async def ping(payload: dict):
+        return {"ok": True}
+
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):  # warm-up
+            await client.post("/ping", json={"n": 1})
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.post("/ping", json={"n": 1})
+        return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)  # measure middleware, not stdout
+
+    legacy = asyncio.run(run(build_app(legacy=True), args.requests))
+    current = asyncio.run(run(build_app(legacy=False), args.requests))
+    print(f"BaseHTTPMiddleware stack: {legacy:8.0f} req/s")
+    print(f"Pure ASGI stack:          {current:8.0f} req/s ({current / legacy - 1:+.0%})")
+
+
+if __name__ == "__main__":
+    main()
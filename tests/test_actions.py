@@ -1,10 +1,21 @@
 """
 Tests for action parsing.
 """
+
 import pytest
+
+from app import actions
 from app.actions import parse_human, parse_with_llm
 
 
+@pytest.fixture(autouse=True)
+def clear_parse_cache():
+    """Isolate tests from cached LLM parses."""
+    actions._parse_cache.clear()
+    yield
+    actions._parse_cache.clear()
+
+
 def test_parse_human_basic():
     """Test basic rule-based parsing."""
     result = parse_human("clockify.get_user")
@@ -68,3 +79,88 @@ async def test_parse_with_llm_success(monkeypatch):
     assert action.integration == "clockify"
     assert action.operation == "get_user"
     assert parser_type == "llm"
+
+
+@pytest.mark.asyncio
+async def test_parse_with_llm_cache_hit(monkeypatch):
+    """Test repeated instructions are served from cache after one LLM call."""
+    from app.llm import client as llm_client
+
+    calls = []
+
+    async def mock_chat(*args, **kwargs):
+        calls.append(args)
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "content": '{"integration": "slack", "operation": "post_message", '
+                        '"params": {"channel": "#general", "text": "heartbeat"}}'
+                    }
+                }
+            ]
+        }
+
+    monkeypatch.setattr(llm_client, "chat", mock_chat)
+
+    first, parser1 = await parse_with_llm("post hourly heartbeat to #general")
+    first.params["text"] = "mutated"
+    second, parser2 = await parse_with_llm("  post hourly   heartbeat to #general ")
+
+    assert len(calls) == 1
+    assert parser1 == parser2 == "llm"
+    assert second.params == {"channel": "#general", "text": "heartbeat"}
+
+
+@pytest.mark.asyncio
+async def test_parse_with_llm_fallback_not_cached(monkeypatch):
+    """Test fallback parses are not cached so the LLM is retried next time."""
+    from app.llm import client as llm_client
+
+    calls = []
+
+    async def mock_chat(*args, **kwargs):
+        calls.append(args)
+        raise RuntimeError("LLM API error")
+
+    monkeypatch.setattr(llm_client, "chat", mock_chat)
+
+    await parse_with_llm("clockify.get_user")
+    await parse_with_llm("clockify.get_user")
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_parse_with_llm_coalesces_concurrent_calls(monkeypatch):
+    """Test concurrent identical parses share a single LLM call."""
+    import asyncio
+
+    from app.llm import client as llm_client
+
+    calls = []
+    release = asyncio.Event()
+
+    async def mock_chat(*args, **kwargs):
+        calls.append(args)
+        await release.wait()
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "content": '{"integration": "clockify", "operation": "get_user", "params": {}}'
+                    }
+                }
+            ]
+        }
+
+    monkeypatch.setattr(llm_client, "chat", mock_chat)
+
+    tasks = [asyncio.create_task(parse_with_llm("who am I in clockify")) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert len(calls) == 1
+    assert all(parser == "llm" for _, parser in results)
+    assert len({id(action) for action, _ in results}) == 5
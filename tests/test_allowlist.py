@@ -0,0 +1,37 @@
+"""
+Tests for the compiled CIDR allowlist.
+"""
+
+from app.routes.webhooks_clockify import _validate_ip_allowlist
+from app.utils.allowlist import IPAllowlist
+
+
+def test_allowlist_ipv4_and_ipv6():
+    """Test membership across merged IPv4 and IPv6 ranges."""
+    allowlist = IPAllowlist("10.0.0.0/8, 192.168.1.0/24,192.168.0.0/24, 2001:db8::/32, bogus")
+
+    assert allowlist.allows("10.1.2.3")
+    assert allowlist.allows("192.168.0.255")
+    assert allowlist.allows("192.168.1.0")
+    assert not allowlist.allows("192.168.2.0")
+    assert not allowlist.allows("11.0.0.0")
+    assert not allowlist.allows("9.255.255.255")
+    assert allowlist.allows("2001:db8::1")
+    assert not allowlist.allows("2001:db9::1")
+    assert allowlist.allows("::ffff:10.0.0.1")
+    assert not allowlist.allows("not-an-ip")
+
+
+def test_allowlist_single_hosts():
+    """Test /32 host entries and exact boundaries."""
+    allowlist = IPAllowlist("1.2.3.4,1.2.3.6/32")
+    assert allowlist.allows("1.2.3.4")
+    assert not allowlist.allows("1.2.3.5")
+    assert allowlist.allows("1.2.3.6")
+
+
+def test_validate_ip_allowlist_recompiles_on_change():
+    """Test the compiled allowlist follows changes to the configured spec."""
+    assert _validate_ip_allowlist("10.0.0.1", "")
+    assert _validate_ip_allowlist("10.0.0.1", "10.0.0.0/24")
+    assert not _validate_ip_allowlist("10.0.0.1", "172.16.0.0/12")
@@ -0,0 +1,107 @@
+"""
+Tests for batch action execution.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.integrations import base
+from app.integrations.base import Integration
+from app.main import app
+from app.routes.actions import _parse_integration_limits
+
+client = TestClient(app)
+
+
+class EchoIntegration(Integration):
+    """Test integration that tracks peak concurrency."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def execute(self, operation, params):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if operation == "fail":
+            raise RuntimeError("boom")
+        return {"ok": True, "echo": params.get("n")}
+
+
+@pytest.fixture
+def echo(monkeypatch):
+    integ = EchoIntegration()
+    monkeypatch.setitem(base._registry, "echo", integ)
+    return integ
+
+
+def test_batch_results_in_order(echo):
+    """Test results are returned per item in request order."""
+    actions = [{"integration": "echo", "operation": "run", "params": {"n": i}} for i in range(5)]
+    actions.append({"integration": "echo", "operation": "fail", "params": {}})
+    actions.append({"integration": "missing", "operation": "run", "params": {}})
+
+    response = client.post("/actions/run/batch", json={"actions": actions})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ok"] is True
+    results = data["data"]["results"]
+    assert [r.get("echo") for r in results[:5]] == [0, 1, 2, 3, 4]
+    assert results[5]["error"]["code"] == "internal_error"
+    assert results[6]["error"]["code"] == "not_found"
+    assert data["data"]["succeeded"] == 5
+    assert data["data"]["failed"] == 2
+
+
+def test_batch_concurrency_caps(echo, monkeypatch):
+    """Test global and per-integration concurrency limits are respected."""
+    actions = [{"integration": "echo", "operation": "run", "params": {}} for _ in range(8)]
+
+    client.post("/actions/run/batch", json={"actions": actions, "concurrency": 3})
+    assert echo.peak == 3
+
+    echo.peak = 0
+    monkeypatch.setattr(settings, "BATCH_INTEGRATION_CONCURRENCY", "echo=2")
+    client.post("/actions/run/batch", json={"actions": actions})
+    assert echo.peak == 2
+
+
+def test_batch_integration_limit_shared_across_batches(echo, monkeypatch):
+    """Test per-integration limits hold across concurrent batches."""
+    monkeypatch.setattr(settings, "BATCH_INTEGRATION_CONCURRENCY", "echo=2")
+    actions = [{"integration": "echo", "operation": "run", "params": {}} for _ in range(4)]
+
+    async def run_batches():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            await asyncio.gather(
+                *(ac.post("/actions/run/batch", json={"actions": actions}) for _ in range(3))
+            )
+
+    asyncio.run(run_batches())
+    assert echo.peak == 2
+
+
+def test_batch_too_many_actions(echo, monkeypatch):
+    """Test oversized batches are rejected."""
+    monkeypatch.setattr(settings, "BATCH_MAX_ACTIONS", 2)
+    actions = [{"integration": "echo", "operation": "run", "params": {}} for _ in range(3)]
+
+    response = client.post("/actions/run/batch", json={"actions": actions})
+    data = response.json()
+    assert data["ok"] is False
+    assert data["error"]["code"] == "validation_error"
+
+
+def test_parse_integration_limits():
+    """Test parsing of per-integration limit spec."""
+    assert _parse_integration_limits("clockify=5, slack=2,bad,zero=0") == {
+        "clockify": 5,
+        "slack": 2,
+    }
@@ -0,0 +1,49 @@
+"""
+Tests for in-memory caching utilities.
+"""
+
+from app.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expiry():
+    """Test entries expire after their TTL."""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5.0, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    assert "a" in cache
+
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+def test_ttl_cache_lru_eviction():
+    """Test least recently used entries are evicted when full."""
+    cache = TTLCache(maxsize=2, ttl=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_cache_disabled():
+    """Test maxsize=0 disables caching."""
+    cache = TTLCache(maxsize=0, ttl=60.0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -1,11 +1,13 @@
 """
 Tests for Clockify client.
 """
+
+import httpx
 import pytest
 import respx
-import httpx
-from app.integrations.clockify_client import ClockifyClient, ClockifyAPIError
-from app.integrations.clockify_types import ClientCreate
+
+from app.integrations.clockify_client import ClockifyAPIError, ClockifyClient
+from app.integrations.clockify_types import ClientCreate, ProjectCreate
 
 
 @pytest.fixture
@@ -61,7 +63,9 @@ async def test_rate_limit_retry(clockify_client):
     respx.get("https://api.clockify.test/v1/user").mock(
         side_effect=[
             httpx.Response(429, json={"message": "Rate limit"}),
-            httpx.Response(200, json={"id": "user123", "email": "test@example.com", "name": "Test"}),
+            httpx.Response(
+                200, json={"id": "user123", "email": "test@example.com", "name": "Test"}
+            ),
         ]
     )
 
@@ -86,8 +90,163 @@ async def test_create_client_success(clockify_client):
         return_value=httpx.Response(201, json=mock_response)
     )
 
-    client = await clockify_client.create_client(
-        "ws123", ClientCreate(**client_data)
-    )
+    client = await clockify_client.create_client("ws123", ClientCreate(**client_data))
     assert client.id == "client123"
     assert client.name == "Test Client"
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_pooled_client_reused_across_requests(clockify_client):
+    """Test the same pooled HTTP client serves every request until closed."""
+    route = respx.get("https://api.clockify.test/v1/user").mock(
+        return_value=httpx.Response(200, json={"id": "u1", "email": "a@b.c", "name": "A"})
+    )
+
+    await clockify_client.get_user()
+    http_client = clockify_client._pool.client
+    await clockify_client.get_user()
+
+    assert route.call_count == 2
+    assert http_client is not None
+    assert clockify_client._pool.client is http_client
+
+    await clockify_client.aclose()
+    assert http_client.is_closed
+    assert clockify_client._pool.client is None
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_limits_from_constructor():
+    """Test pool limits and context manager lifecycle."""
+    limits = httpx.Limits(max_connections=5, max_keepalive_connections=2)
+    async with ClockifyClient(api_key="k", limits=limits, http2=False) as client:
+        assert client.limits is limits
+        assert client._pool.client is not None and not client._pool.client.is_closed
+    assert client._pool.client is None
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_list_projects_all_pages(clockify_client):
+    """Test list_projects follows pagination until a short page."""
+    pages = {
+        "1": [
+            {"id": "p1", "name": "A", "workspaceId": "ws1"},
+            {"id": "p2", "name": "B", "workspaceId": "ws1"},
+        ],
+        "2": [{"id": "p3", "name": "C", "workspaceId": "ws1"}],
+    }
+
+    def by_page(request):
+        assert request.url.params["page-size"] == "2"
+        return httpx.Response(200, json=pages.get(request.url.params["page"], []))
+
+    route = respx.get("https://api.clockify.test/v1/workspaces/ws1/projects").mock(
+        side_effect=by_page
+    )
+
+    projects = await clockify_client.list_projects("ws1", page_size=2)
+    assert [p.id for p in projects] == ["p1", "p2", "p3"]
+    assert route.call_count == 2
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_iter_clients_stops_early(clockify_client):
+    """Test streaming can stop early and exact-multiple pages end on an empty page."""
+
+    def by_page(request):
+        page = int(request.url.params["page"])
+        if page > 2:
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json=[{"id": f"c{page}", "name": "C", "workspaceId": "ws1"}])
+
+    route = respx.get("https://api.clockify.test/v1/workspaces/ws1/clients").mock(
+        side_effect=by_page
+    )
+
+    clients = [c.id async for c in clockify_client.iter_clients("ws1", page_size=1)]
+    assert clients == ["c1", "c2"]
+    assert route.call_count == 3
+
+    stream = clockify_client.iter_clients("ws1", page_size=1)
+    async for first in stream:
+        break
+    await stream.aclose()
+    assert first.id == "c1"
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_metadata_cache_and_invalidation(clockify_client):
+    """Test project listings are cached until invalidated or a project is created."""
+    route = respx.get("https://api.clockify.test/v1/workspaces/ws1/projects").mock(
+        return_value=httpx.Response(200, json=[{"id": "p1", "name": "A", "workspaceId": "ws1"}])
+    )
+    respx.post("https://api.clockify.test/v1/workspaces/ws1/projects").mock(
+        return_value=httpx.Response(201, json={"id": "p2", "name": "B", "workspaceId": "ws1"})
+    )
+
+    await clockify_client.list_projects("ws1")
+    await clockify_client.list_projects("ws1")
+    assert route.call_count == 1
+
+    clockify_client.invalidate_metadata("ws1", "projects")
+    await clockify_client.list_projects("ws1")
+    assert route.call_count == 2
+
+    await clockify_client.create_project("ws1", ProjectCreate(name="B"))
+    await clockify_client.list_projects("ws1")
+    assert route.call_count == 3
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_retry_after_blocks_shared_throttle():
+    """Test Retry-After on 429 pauses every client sharing the API key."""
+    first = ClockifyClient(
+        api_key="shared_key", base_url="https://api.clockify.test", max_retries=2
+    )
+    second = ClockifyClient(api_key="shared_key", base_url="https://api.clockify.test")
+    assert first._throttle is second._throttle
+
+    respx.get("https://api.clockify.test/v1/user").mock(
+        side_effect=[
+            httpx.Response(429, headers={"Retry-After": "0.2"}),
+            httpx.Response(200, json={"id": "u1", "email": "a@b.c", "name": "A"}),
+        ]
+    )
+
+    await first.get_user()
+    assert first._throttle.blocked_until > 0
+
+
+def test_retry_after_parsing():
+    """Test Retry-After header parsing for seconds, dates and garbage."""
+    from app.integrations.clockify_client import _retry_after_seconds
+
+    assert _retry_after_seconds(httpx.Response(429, headers={"Retry-After": "3"})) == 3.0
+    assert _retry_after_seconds(httpx.Response(429, headers={"Retry-After": "9999"})) == 60.0
+    assert (
+        _retry_after_seconds(
+            httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        )
+        == 0.0
+    )
+    assert _retry_after_seconds(httpx.Response(429, headers={"Retry-After": "soon"})) is None
+    assert _retry_after_seconds(httpx.Response(429)) is None
+
+
+@pytest.mark.asyncio
+async def test_outbound_throttle_spaces_requests():
+    """Test the outbound throttle queues callers beyond the burst."""
+    import asyncio
+    import time
+
+    from app.utils.throttle import OutboundThrottle
+
+    throttle = OutboundThrottle(rate_per_second=20, burst=1)
+    start = time.time()
+    await asyncio.gather(*(throttle.acquire() for _ in range(3)))
+    assert time.time() - start >= 0.09
@@ -0,0 +1,102 @@
+"""
+Tests for Clockify webhook event classification.
+"""
+
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from app.integrations import clockify_events
+from app.integrations.clockify_events import EVENT_TYPES, _rule, classify_event
+
+SAMPLES_PATH = Path(__file__).resolve().parent.parent / "Clockify_Webhook_JSON_Samples.md"
+
+
+def _load_samples():
+    text = SAMPLES_PATH.read_text(encoding="utf-8")
+    return {
+        name: json.loads(body)
+        for name, body in re.findall(
+            r"^## (\w+)\s*\n```json\n(.*?)\n```", text, re.MULTILINE | re.DOTALL
+        )
+    }
+
+
+SAMPLES = _load_samples()
+
+# Payload shapes Clockify shares between entities; only the header tells them apart
+AMBIGUOUS = {
+    "NEW_TAG": "CLIENT",
+    "TAG_UPDATED": "CLIENT",
+    "TAG_DELETED": "CLIENT",
+    "TIME_ENTRY_BATCH_DELETED": "UNKNOWN",
+}
+
+
+def _without_timer(event_type):
+    return "TIME_ENTRY" if event_type == "NEW_TIMER_STARTED" else event_type
+
+
+def test_every_sample_has_an_event_type():
+    assert len(SAMPLES) == 50
+    assert set(SAMPLES) == set(EVENT_TYPES)
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_classify_sample_with_header(name):
+    assert classify_event(SAMPLES[name], name) == EVENT_TYPES[name]
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_classify_sample_by_payload(name):
+    event_type = classify_event(SAMPLES[name])
+    # Header-less time entries are refined by their end time instead
+    assert _without_timer(event_type) == AMBIGUOUS.get(name, _without_timer(EVENT_TYPES[name]))
+
+
+def test_classify_time_entry_refinement():
+    running = {
+        "id": "e1",
+        "userId": "u1",
+        "timeInterval": {"start": "2024-01-01T10:00:00Z", "end": None},
+    }
+    stopped = {
+        "id": "e1",
+        "userId": "u1",
+        "timeInterval": {"start": "2024-01-01T10:00:00Z", "end": "2024-01-01T11:00:00Z"},
+    }
+
+    assert classify_event(running) == "NEW_TIMER_STARTED"
+    assert classify_event(stopped) == "TIME_ENTRY"
+    assert classify_event(running, "TIMER_STOPPED") == "TIME_ENTRY"
+
+
+def test_classify_unknown_header_falls_back_to_payload():
+    payload = {"id": "c1", "name": "Acme", "archived": False, "workspaceId": "ws1"}
+
+    assert classify_event(payload, "SOMETHING_NEW") == "CLIENT"
+    assert classify_event(payload, " new_tag ") == "TAG"
+    assert classify_event({"foo": 1}) == "UNKNOWN"
+
+
+def test_register_event_rule(monkeypatch):
+    monkeypatch.setattr(clockify_events, "EVENT_RULES", clockify_events.EVENT_RULES)
+    monkeypatch.setattr(clockify_events, "_signatures", {})
+    payload = {"id": "w1", "widget": True}
+    assert classify_event(payload) == "UNKNOWN"
+
+    clockify_events.register_event_rule(_rule("WIDGET", "widget"))
+    assert classify_event(payload) == "WIDGET"
+    assert classify_event(SAMPLES["NEW_PROJECT"]) == "PROJECT"
+
+
+def test_signature_memo_is_bounded(monkeypatch):
+    """Test the memo of payload field sets is cleared when full."""
+    monkeypatch.setattr(clockify_events, "_signatures", {})
+    monkeypatch.setattr(clockify_events, "_MAX_SIGNATURES", 2)
+
+    for i in range(5):
+        assert classify_event({"id": "x", f"field{i}": 1}) == "UNKNOWN"
+        assert len(clockify_events._signatures) <= 2
@@ -0,0 +1,79 @@
+"""
+Tests for webhook idempotency stores.
+"""
+
+import pytest
+
+from app.idempotency import MemoryIdempotencyStore, SQLiteIdempotencyStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_memory_store_ttl_and_discard():
+    """Test duplicates expire after TTL and can be discarded."""
+    clock = FakeClock()
+    store = MemoryIdempotencyStore(capacity=10, ttl=60, clock=clock)
+
+    assert await store.check_and_record("evt1") is False
+    assert await store.check_and_record("evt1") is True
+
+    clock.now += 61
+    assert await store.check_and_record("evt1") is False
+
+    await store.discard("evt1")
+    assert await store.check_and_record("evt1") is False
+
+
+@pytest.mark.asyncio
+async def test_memory_store_capacity():
+    """Test the oldest IDs are evicted beyond capacity."""
+    store = MemoryIdempotencyStore(capacity=2, ttl=60)
+    for event_id in ("a", "b", "c"):
+        await store.check_and_record(event_id)
+
+    assert len(store) == 2
+    assert await store.check_and_record("a") is False
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_shared_between_instances(tmp_path):
+    """Test two stores on one file (e.g. two workers) share duplicates."""
+    path = str(tmp_path / "events.sqlite3")
+    clock = FakeClock()
+    first = SQLiteIdempotencyStore(path, capacity=100, ttl=60, clock=clock)
+    second = SQLiteIdempotencyStore(path, capacity=100, ttl=60, clock=clock)
+
+    assert await first.check_and_record("evt1") is False
+    assert await second.check_and_record("evt1") is True
+
+    clock.now += 61
+    assert await second.check_and_record("evt1") is False
+
+    await first.discard("evt1")
+    assert await second.check_and_record("evt1") is False
+
+    first.close()
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_prunes_to_capacity(tmp_path, monkeypatch):
+    """Test pruning keeps at most `capacity` of the newest IDs."""
+    clock = FakeClock()
+    store = SQLiteIdempotencyStore(str(tmp_path / "e.sqlite3"), capacity=3, ttl=60, clock=clock)
+    monkeypatch.setattr(store, "PRUNE_EVERY", 5)
+
+    for i in range(5):
+        clock.now += 1
+        await store.check_and_record(f"evt{i}")
+
+    rows = store._db.execute("SELECT event_id FROM webhook_events ORDER BY event_id").fetchall()
+    assert [r[0] for r in rows] == ["evt2", "evt3", "evt4"]
+    store.close()
@@ -0,0 +1,58 @@
+"""
+Tests for the JSON backend helpers.
+"""
+
+import json
+
+from app.models import ApiResponse
+from app.utils import jsonlib
+from app.utils.logging import JSONFormatter
+
+
+def test_dumps_matches_stdlib():
+    """Test output is compact UTF-8 JSON that round-trips through stdlib."""
+    obj = {"name": "Café", "n": [1, 2.5, None, True], 3: "int key"}
+    encoded = jsonlib.dumps(obj)
+    assert isinstance(encoded, bytes)
+    assert encoded == json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+    assert jsonlib.loads(encoded) == json.loads(encoded)
+
+
+def test_dumps_pydantic_and_big_ints():
+    """Test pydantic models and integers wider than 64 bits serialize."""
+    response = ApiResponse.success(data={"big": 2**70}, request_id="r1")
+    decoded = json.loads(jsonlib.dumps(response))
+    assert decoded["ok"] is True
+    assert decoded["data"]["big"] == 2**70
+    assert decoded["requestId"] == "r1"
+
+
+def test_loads_big_ints():
+    """Test integers wider than 64 bits decode exactly, as with dumps."""
+    big = 123456789012345678901234567890
+    for data in (f'{{"big": {big}}}', f'{{"big": {big}}}'.encode()):
+        assert jsonlib.loads(data) == {"big": big}
+    assert jsonlib.loads(b"[-9223372036854775809, 1.5]") == [-9223372036854775809, 1.5]
+    assert jsonlib.loads(jsonlib.dumps({"big": 2**70})) == {"big": 2**70}
+
+
+def test_stdlib_fallback(monkeypatch):
+    """Test the stdlib backend produces identical output."""
+    obj = {"a": [1, "b", {"c": None}], "d": "é"}
+    fast = jsonlib.dumps(obj)
+    monkeypatch.setattr(jsonlib, "BACKEND", "json")
+    assert jsonlib.dumps(obj) == fast
+    assert jsonlib.loads(fast) == obj
+
+
+def test_json_formatter():
+    """Test the log formatter emits one JSON object per record."""
+    import logging
+
+    record = logging.LogRecord("app", logging.INFO, __file__, 1, "hello %s", ("world",), None)
+    record.request_id = "req-1"
+    line = JSONFormatter().format(record)
+    assert isinstance(line, str)
+    parsed = json.loads(line)
+    assert parsed["msg"] == "hello world"
+    assert parsed["request_id"] == "req-1"
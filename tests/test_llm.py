@@ -0,0 +1,55 @@
+"""
+Tests for the pooled LLM client.
+"""
+
+import httpx
+import pytest
+import respx
+
+from app.llm import LLMClient
+
+
+@pytest.fixture
+def llm():
+    """Create a test LLM client."""
+    return LLMClient(
+        base_url="https://llm.test",
+        api_key="test_key",
+        model="test-model",
+        timeout=5.0,
+        max_retries=2,
+    )
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_chat_reuses_pooled_client(llm):
+    """Test retries and subsequent calls share one pooled HTTP client."""
+    route = respx.post("https://llm.test/chat/completions").mock(
+        side_effect=[
+            httpx.Response(503),
+            httpx.Response(200, json={"choices": []}),
+            httpx.Response(200, json={"choices": []}),
+        ]
+    )
+
+    await llm.chat([{"role": "user", "content": "hi"}])
+    http_client = llm._pool.client
+    await llm.chat([{"role": "user", "content": "hi"}])
+
+    assert route.call_count == 3
+    assert llm._pool.client is http_client
+
+    await llm.aclose()
+    assert http_client.is_closed
+    assert llm._pool.client is None
+
+
+@pytest.mark.asyncio
+async def test_chat_missing_api_key():
+    """Test missing API key raises before any connection is opened."""
+    llm = LLMClient(base_url="https://llm.test")
+    llm.api_key = None
+    with pytest.raises(RuntimeError, match="API key missing"):
+        await llm.chat([{"role": "user", "content": "hi"}])
+    assert llm._pool.client is None
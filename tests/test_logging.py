@@ -0,0 +1,140 @@
+"""
+Tests for logging configuration.
+"""
+
+import json
+import logging
+import logging.handlers
+import threading
+
+from app.utils.logging import DroppingQueueHandler, JSONFormatter
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def test_queue_handler_drops_when_full():
+    """Test records beyond the queue size are dropped and counted, not blocked on."""
+    handler = DroppingQueueHandler(maxsize=2)
+    logger = logging.getLogger("test.queue.drop")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(5):
+            logger.warning(f"record {i}")
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_stop_log_listener_with_full_queue(monkeypatch):
+    """Test stopping the listener behind a stalled handler neither raises nor leaks."""
+    from app.utils import logging as app_logging
+
+    class StalledHandler(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.unblocked = threading.Event()
+
+        def emit(self, record):
+            self.unblocked.wait(5)
+
+    sink = StalledHandler()
+    handler = DroppingQueueHandler(maxsize=2)
+    listener = app_logging.DroppingQueueListener(handler, sink, sentinel_timeout=0.05)
+    root = logging.getLogger()
+    monkeypatch.setattr(app_logging, "_listener", listener)
+    root.addHandler(handler)
+    listener.start()
+    logger = logging.getLogger("test.queue.stop")
+    logger.setLevel(logging.INFO)
+    try:
+        for i in range(10):
+            logger.info(f"record {i}")
+        assert handler.queue.full()
+
+        threading.Timer(0.2, sink.unblocked.set).start()
+        app_logging.stop_log_listener()
+    finally:
+        sink.unblocked.set()
+        root.removeHandler(handler)
+        root.removeHandler(sink)
+
+    assert listener._thread is None
+    assert app_logging._listener is None
+    assert handler.dropped >= 8
+
+
+def test_queue_listener_preserves_json_fields():
+    """Test queued records keep extra fields and tracebacks for JSONFormatter."""
+    handler = DroppingQueueHandler(maxsize=100)
+    sink = ListHandler()
+    sink.setFormatter(JSONFormatter())
+    listener = logging.handlers.QueueListener(handler.queue, sink)
+    logger = logging.getLogger("test.queue.json")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    listener.start()
+    try:
+        logger.info("hello %s", "world", extra={"request_id": "req-1"})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+
+    first, second = (json.loads(line) for line in sink.lines)
+    assert first["msg"] == "hello world"
+    assert first["request_id"] == "req-1"
+    assert second["msg"] == "failed"
+    assert "ValueError: boom" in second["exc_info"]
+
+
+def test_request_log_sampling(caplog):
+    """Test errors and slow requests are always logged, skipped paths never."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.main import RequestIDMiddleware
+
+    sampled = FastAPI()
+    sampled.add_middleware(RequestIDMiddleware, sample_rate=0.0, slow_ms=50, skip_paths="/healthz")
+
+    @sampled.get("/healthz")
+    async def healthz():
+        return {"ok": True}
+
+    @sampled.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    @sampled.get("/slow")
+    async def slow():
+        import asyncio
+
+        await asyncio.sleep(0.06)
+        return {"ok": True}
+
+    test_client = TestClient(sampled)
+    with caplog.at_level(logging.INFO, logger="app.main"):
+        test_client.get("/healthz")
+        test_client.get("/fast")
+        test_client.get("/slow")
+        test_client.get("/missing")
+
+    completed = [r.getMessage() for r in caplog.records if "Request completed" in r.getMessage()]
+    assert completed == [
+        "Request completed: GET /slow status=200",
+        "Request completed: GET /missing status=404",
+    ]
@@ -0,0 +1,110 @@
+"""
+Tests for outbound HTTP instrumentation.
+"""
+
+import httpx
+import pytest
+import respx
+from prometheus_client import REGISTRY
+
+from app.integrations import slack  # noqa: F401
+from app.integrations.base import get_integration
+from app.llm import LLMClient
+from app.observability.outbound import InstrumentedTransport, operation_name
+from app.utils.http import create_http_client
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, {"service": "clankerbot", **labels}) or 0
+
+
+def test_operation_name_templates_ids():
+    """Test resource IDs are collapsed so operation labels stay low-cardinality."""
+    assert (
+        operation_name("get", "/api/v1/workspaces/5f1e2d3c4b5a697887766554/projects")
+        == "GET /api/v1/workspaces/{id}/projects"
+    )
+    assert operation_name("POST", "/chat/completions") == "POST /chat/completions"
+    assert operation_name("GET", "/items/42") == "GET /items/{id}"
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_instrumented_client_records_attempts():
+    """Test latency, status counts, in-flight and pool metrics per upstream."""
+    respx.get("https://up.test/items/7").mock(
+        side_effect=[httpx.Response(200), httpx.Response(404)]
+    )
+    respx.get("https://up.test/boom").mock(side_effect=httpx.ConnectError("down"))
+    labels = {"upstream": "test", "operation": "GET /items/{id}"}
+
+    async with create_http_client(upstream="test") as client:
+        await client.get("https://up.test/items/7")
+        await client.get("https://up.test/items/7")
+        with pytest.raises(httpx.ConnectError):
+            await client.get("https://up.test/boom")
+
+        assert sample("outbound_requests_total", status="200", **labels) == 1
+        assert sample("outbound_requests_total", status="404", **labels) == 1
+        assert (
+            sample(
+                "outbound_requests_total", upstream="test", operation="GET /boom", status="error"
+            )
+            == 1
+        )
+        assert sample("outbound_request_duration_seconds_count", status_class="2xx", **labels) == 1
+        assert sample("outbound_requests_inflight", upstream="test") == 0
+        # Pool stats are exported for live instrumented clients
+        assert (
+            REGISTRY.get_sample_value(
+                "outbound_pool_connections",
+                {"service": "clankerbot", "upstream": "test", "state": "pending"},
+            )
+            == 0
+        )
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_llm_retries_counted():
+    """Test LLM retries are counted by reason."""
+    respx.post("https://llm-retry.test/chat/completions").mock(
+        side_effect=[httpx.Response(503), httpx.Response(200, json={"choices": []})]
+    )
+    llm = LLMClient(base_url="https://llm-retry.test", api_key="k", max_retries=2)
+    labels = {"upstream": "llm", "operation": "POST /chat/completions", "reason": "503"}
+    before = sample("outbound_retries_total", **labels)
+
+    await llm.chat([{"role": "user", "content": "hi"}])
+    await llm.aclose()
+
+    assert sample("outbound_retries_total", **labels) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_slack_pooled_client_lifecycle():
+    """Test Slack reuses one pooled client until aclose()."""
+    integration = get_integration("slack")
+    await integration.startup()
+    http_client = integration.open()
+
+    assert integration.open() is http_client
+
+    await integration.aclose()
+    assert http_client.is_closed
+    assert integration.open() is not http_client
+    await integration.aclose()
+
+
+def test_pool_stats_without_httpcore_pool():
+    """Test transports without httpcore pool internals report no pool stats."""
+
+    class OddPool:
+        connections = None
+
+    mock = InstrumentedTransport(httpx.MockTransport(lambda request: httpx.Response(200)), "t")
+    odd = InstrumentedTransport(httpx.AsyncHTTPTransport(), "t")
+    odd.transport._pool = OddPool()
+
+    assert mock.pool_stats() is None
+    assert odd.pool_stats() is None
@@ -0,0 +1,79 @@
+"""
+Tests for the admin profiling endpoint.
+"""
+
+import asyncio
+import marshal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.observability import profiling
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+    return {"X-Admin-Token": "s3cret"}
+
+
+def test_profile_disabled_without_token(monkeypatch):
+    """Test the endpoint is off unless ADMIN_TOKEN is configured."""
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    response = client.get("/admin/profile")
+    assert response.status_code == 404
+    assert response.json()["ok"] is False
+    assert response.json()["error"]["code"] == "not_found"
+
+
+def test_profile_requires_admin_token(admin_token):
+    """Test a missing token is unauthorized and a wrong one forbidden."""
+    response = client.get("/admin/profile")
+    assert response.status_code == 401
+    assert response.json()["error"]["code"] == "unauthorized"
+
+    response = client.get("/admin/profile", headers={"X-Admin-Token": "nope"})
+    assert response.status_code == 403
+    assert response.json()["error"]["code"] == "forbidden"
+
+
+def test_profile_cpu_collapsed(admin_token):
+    """Test sampled CPU profile is returned as collapsed stacks."""
+    response = client.get("/admin/profile?seconds=0.2&interval_ms=2", headers=admin_token)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    assert ";" in stack
+
+
+def test_profile_cpu_pstats(admin_token):
+    """Test the deterministic profile is a loadable pstats file."""
+    response = client.get("/admin/profile?format=pstats&seconds=0.1", headers=admin_token)
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert isinstance(marshal.loads(response.content), dict)
+
+    response = client.get("/admin/profile?format=text&seconds=0.1", headers=admin_token)
+    assert "function calls" in response.text
+
+
+def test_profile_memory(admin_token):
+    """Test tracemalloc snapshot diff output."""
+    response = client.get("/admin/profile?mode=memory&seconds=0.1", headers=admin_token)
+    assert response.text.startswith("# traced memory:")
+
+
+@pytest.mark.asyncio
+async def test_profile_one_at_a_time():
+    """Test a second profile fails fast while one is running."""
+    running = asyncio.create_task(profiling.sample_cpu(0.2))
+    await asyncio.sleep(0.05)
+    with pytest.raises(profiling.ProfileBusyError):
+        await profiling.trace_memory(0.1)
+    assert await running
@@ -1,7 +1,9 @@
 """
 Tests for rate limiting middleware.
 """
+
 from fastapi.testclient import TestClient
+
 from app.main import app
 
 client = TestClient(app)
@@ -27,3 +29,235 @@ def test_rate_limit_per_path():
 
     assert response1.status_code == 200
     assert response2.status_code == 200
+
+
+def test_rate_limit_exceeded_envelope():
+    """Test 429 envelope once the bucket is empty."""
+    from fastapi import FastAPI
+
+    from app.middleware.ratelimit import RateLimitMiddleware
+
+    limited = FastAPI()
+    limited.add_middleware(RateLimitMiddleware, capacity=1, burst=1)
+
+    @limited.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    test_client = TestClient(limited)
+    assert test_client.get("/ping").status_code == 200
+
+    response = test_client.get("/ping")
+    assert response.status_code == 429
+    assert response.json()["error"]["code"] == "rate_limited"
+
+
+def test_request_id_header():
+    """Test the request ID is echoed or generated on every response."""
+    response = client.get("/healthz", headers={"X-Request-ID": "req-123"})
+    assert response.headers["X-Request-ID"] == "req-123"
+
+    response = client.get("/healthz")
+    assert len(response.headers["X-Request-ID"]) == 26
+
+
+def test_rate_limit_buckets_bounded():
+    """Test bucket storage is LRU-capped and idle buckets are swept."""
+    import time
+
+    from app.middleware.ratelimit import MemoryRateLimitBackend
+
+    limiter = MemoryRateLimitBackend(capacity=60, refill_rate=1.0, burst=10, max_buckets=3)
+    for i in range(5):
+        limiter._get_bucket((f"10.0.0.{i}", "/x"))
+    assert list(limiter.buckets) == [(f"10.0.0.{i}", "/x") for i in (2, 3, 4)]
+
+    limiter._get_bucket(("10.0.0.2", "/x"))
+    assert next(reversed(limiter.buckets)) == ("10.0.0.2", "/x")
+
+    # Buckets idle for a full refill period (10 tokens at 1/s) are swept
+    now = time.time()
+    limiter.buckets[("10.0.0.3", "/x")].last_refill = now - 11
+    limiter._sweep(now)
+    assert list(limiter.buckets) == [("10.0.0.4", "/x"), ("10.0.0.2", "/x")]
+
+
+def test_sqlite_backend_shared_between_workers(tmp_path):
+    """Test two backends on one file (e.g. two workers) share one budget."""
+    import asyncio
+
+    from app.middleware.ratelimit import SQLiteRateLimitBackend
+
+    class Clock:
+        now = 1000.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    path = str(tmp_path / "ratelimit.sqlite3")
+    first = SQLiteRateLimitBackend(path, capacity=60, refill_rate=1.0, burst=2, clock=clock)
+    second = SQLiteRateLimitBackend(path, capacity=60, refill_rate=1.0, burst=2, clock=clock)
+    key = ("10.0.0.1", "/x")
+
+    async def scenario():
+        assert await first.consume(key)
+        assert await second.consume(key)
+        assert not await first.consume(key)
+        assert await second.consume(("10.0.0.2", "/x"))
+        clock.now += 1.0
+        assert await second.consume(key)
+        assert not await first.consume(key)
+
+    asyncio.run(scenario())
+    first.close()
+    second.close()
+
+
+def test_sqlite_backend_policies_isolated(tmp_path):
+    """Test policies sharing the SQLite table keep and prune separate buckets."""
+    import asyncio
+    import sqlite3
+
+    from app.middleware.ratelimit import SQLiteRateLimitBackend
+
+    class Clock:
+        now = 1000.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    path = str(tmp_path / "ratelimit.sqlite3")
+    slow = SQLiteRateLimitBackend(path, capacity=1, refill_rate=0.01, burst=1, clock=clock)
+    fast = SQLiteRateLimitBackend(
+        path, capacity=60, refill_rate=10.0, burst=1, clock=clock, policy="/fast"
+    )
+    fast.PRUNE_EVERY = 1
+    key = ("10.0.0.1", "/x")
+
+    async def scenario():
+        # Same (client, template) key, separate buckets per policy
+        assert await slow.consume(key)
+        assert await fast.consume(key)
+        assert not await slow.consume(key)
+
+        # The fast policy's prune must not reset the slow bucket
+        clock.now += 1.0
+        assert await fast.consume(("10.0.0.2", "/x"))
+        assert not await slow.consume(key)
+
+    asyncio.run(scenario())
+    slow.close()
+    fast.close()
+
+    rows = (
+        sqlite3.connect(path)
+        .execute("SELECT policy, client FROM rate_limit_buckets ORDER BY policy, client")
+        .fetchall()
+    )
+    assert rows == [("/fast", "10.0.0.2"), ("default", "10.0.0.1")]
+
+
+def test_rate_limit_buckets_gauge_sums_backends():
+    """Test the bucket gauge counts buckets of every memory backend."""
+    import gc
+
+    from prometheus_client import REGISTRY
+
+    from app.middleware.ratelimit import MemoryRateLimitBackend
+
+    def gauge():
+        return REGISTRY.get_sample_value("rate_limit_buckets", {"service": "clankerbot"})
+
+    gc.collect()  # drop middleware from earlier tests so the total is stable
+    before = gauge()
+    first = MemoryRateLimitBackend(capacity=60, refill_rate=1.0, burst=10, max_buckets=10)
+    second = MemoryRateLimitBackend(capacity=5, refill_rate=1.0, burst=5, max_buckets=10)
+    first._get_bucket(("10.0.0.1", "/x"))
+    first._get_bucket(("10.0.0.2", "/x"))
+    second._get_bucket(("10.0.0.1", "/x"))
+    assert gauge() == before + 3
+
+
+def test_route_policies():
+    """Test exemptions, cost weights and per-template buckets."""
+    from fastapi import FastAPI
+
+    from app.config import RateLimitPolicy
+    from app.middleware.ratelimit import RateLimitMiddleware
+
+    limited = FastAPI()
+    limited.add_middleware(
+        RateLimitMiddleware,
+        capacity=2,
+        burst=2,
+        exempt_paths=["/healthz"],
+        policies={
+            "/items/{item_id}?expensive=true": RateLimitPolicy(cost=2),
+            "/bulk": RateLimitPolicy(capacity=5, burst=5),
+        },
+    )
+
+    @limited.get("/healthz")
+    async def healthz():
+        return {"ok": True}
+
+    @limited.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"ok": True}
+
+    @limited.get("/bulk")
+    async def bulk():
+        return {"ok": True}
+
+    test_client = TestClient(limited)
+
+    # Exempt route is never limited
+    for _ in range(5):
+        assert test_client.get("/healthz").status_code == 200
+
+    # Different item IDs share the /items/{item_id} bucket
+    assert test_client.get("/items/1").status_code == 200
+    assert test_client.get("/items/2").status_code == 200
+    response = test_client.get("/items/3")
+    assert response.status_code == 429
+    assert "Max 2 requests" in response.json()["error"]["message"]
+
+    # Separate capacity on its own bucket
+    for _ in range(5):
+        assert test_client.get("/bulk").status_code == 200
+    response = test_client.get("/bulk")
+    assert response.status_code == 429
+    assert "Max 5 requests" in response.json()["error"]["message"]
+
+    # Unknown paths share one bucket per client
+    assert test_client.get("/nope/1").status_code == 404
+    assert test_client.get("/nope/2").status_code == 404
+    assert test_client.get("/nope/3").status_code == 429
+
+
+def test_route_policy_cost():
+    """Test a conditional policy charges its cost only when the query matches."""
+    from fastapi import FastAPI
+
+    from app.config import RateLimitPolicy
+    from app.middleware.ratelimit import RateLimitMiddleware
+
+    limited = FastAPI()
+    limited.add_middleware(
+        RateLimitMiddleware,
+        capacity=3,
+        burst=3,
+        policies={"/parse?llm=true": RateLimitPolicy(cost=2)},
+    )
+
+    @limited.post("/parse")
+    async def parse():
+        return {"ok": True}
+
+    test_client = TestClient(limited)
+    assert test_client.post("/parse?llm=true").status_code == 200  # 3 -> 1
+    assert test_client.post("/parse?llm=true").status_code == 429
+    assert test_client.post("/parse").status_code == 200  # 1 -> 0
+    assert test_client.post("/parse").status_code == 429
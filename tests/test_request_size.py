@@ -0,0 +1,58 @@
+"""
+Tests for request size limit middleware.
+"""
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.middleware.request_size import RequestSizeLimitMiddleware
+
+app = FastAPI()
+app.add_middleware(RequestSizeLimitMiddleware, max_size_bytes=100)
+
+
+@app.post("/echo")
+async def echo(request: Request):
+    body = await request.body()
+    return {"size": len(body)}
+
+
+client = TestClient(app)
+
+
+def test_request_within_limit():
+    """Test bodies under the limit reach the app."""
+    response = client.post("/echo", content=b"x" * 100)
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+
+
+def test_content_length_over_limit():
+    """Test 413 envelope when Content-Length exceeds the limit."""
+    response = client.post("/echo", content=b"x" * 101)
+    assert response.status_code == 413
+    assert response.json()["error"]["code"] == "payload_too_large"
+
+
+def test_chunked_body_over_limit():
+    """Test chunked uploads without Content-Length are cut off at the limit."""
+    response = client.post("/echo", content=(b"x" * 30 for _ in range(50)))
+    assert response.status_code == 413
+    assert response.json()["error"]["code"] == "payload_too_large"
+
+
+def test_chunked_body_within_limit():
+    """Test chunked uploads under the limit are passed through intact."""
+    response = client.post("/echo", content=iter([b"x" * 40, b"y" * 40]))
+    assert response.status_code == 200
+    assert response.json() == {"size": 80}
+
+
+def test_streamed_body_rejected_in_webhook_route():
+    """Test the webhook route's own JSON error does not replace the 413."""
+    from app.main import app as main_app
+
+    main_client = TestClient(main_app)
+    oversized = (b"x" * 65536 for _ in range(20))  # 1.25MB > 1MB default
+    response = main_client.post("/webhooks/clockify", content=oversized)
+    assert response.status_code == 413
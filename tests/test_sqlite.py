@@ -0,0 +1,32 @@
+"""
+Tests for the shared SQLite helper.
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils.sqlite import SQLiteDatabase
+
+
+def test_transaction_commits_or_rolls_back(tmp_path):
+    """Test a failing block leaves no partial writes behind."""
+    db = SQLiteDatabase(str(tmp_path / "t.sqlite3"))
+    db.execute("CREATE TABLE t (v INTEGER)")
+
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pytest.raises(RuntimeError), db.transaction() as conn:
+        conn.execute("INSERT INTO t VALUES (2)")
+        raise RuntimeError("boom")
+
+    rows = asyncio.run(db.run(lambda: db.execute("SELECT v FROM t").fetchall()))
+    assert rows == [(1,)]
+    db.close()
+
+
+def test_count_write(tmp_path):
+    """Test periodic work triggers on every n-th write."""
+    db = SQLiteDatabase(str(tmp_path / "t.sqlite3"))
+    assert [db.count_write(3) for _ in range(6)] == [False, False, True, False, False, True]
+    db.close()
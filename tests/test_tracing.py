@@ -0,0 +1,136 @@
+"""
+Tests for opt-in OpenTelemetry tracing.
+"""
+
+import json
+
+import httpx
+import pytest
+import respx
+
+pytest.importorskip("opentelemetry.sdk")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app.config import settings
+from app.observability import tracing
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    """Enable tracing into an in-memory exporter for one test."""
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    tracing.setup_tracing(exporter=exporter)
+    yield exporter
+    tracing.shutdown_tracing()
+
+
+def test_tracing_disabled_is_noop():
+    """Test helpers pass through without a tracer provider."""
+    from app.middleware.ratelimit import RateLimitMiddleware
+
+    assert not tracing.tracing_enabled()
+    assert tracing.traced_middleware(RateLimitMiddleware) is RateLimitMiddleware
+    with tracing.start_span("unused") as span:
+        assert span is None
+
+
+def test_request_and_middleware_spans(spans):
+    """Test the server span uses the route template and carries the request ID."""
+    from app.main import RequestIDMiddleware
+    from app.middleware.tracing import TracingMiddleware
+
+    traced_app = FastAPI()
+    traced_app.add_middleware(tracing.traced_middleware(RequestIDMiddleware))
+    traced_app.add_middleware(TracingMiddleware)
+
+    @traced_app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"ok": True}
+
+    response = TestClient(traced_app).get("/items/42", headers={"X-Request-ID": "req-trace"})
+    assert response.status_code == 200
+
+    by_name = {span.name: span for span in spans.get_finished_spans()}
+    server = by_name["GET /items/{item_id}"]
+    assert server.attributes["request.id"] == "req-trace"
+    assert server.attributes["http.response.status_code"] == 200
+    middleware = by_name["middleware RequestIDMiddleware"]
+    assert middleware.parent.span_id == server.context.span_id
+
+
+@pytest.mark.asyncio
+async def test_scheduler_job_spans(spans):
+    """Test scheduler jobs trace the job and the integration call."""
+    from app.scheduler import _job
+
+    await _job("slack", "post_message", {"channel": "#c", "text": "hi"})
+
+    job, execute = sorted(spans.get_finished_spans(), key=lambda s: s.name, reverse=True)
+    assert job.name == "scheduler.job"
+    assert execute.name == "integration.execute"
+    assert execute.parent.span_id == job.context.span_id
+    assert execute.attributes["integration"] == "slack"
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_outbound_client_span(spans):
+    """Test instrumented HTTP clients emit a client span per attempt."""
+    from app.utils.http import create_http_client
+
+    respx.get("https://up.test/items/9").mock(return_value=httpx.Response(503))
+    async with create_http_client(upstream="test") as client:
+        await client.get("https://up.test/items/9")
+
+    (span,) = spans.get_finished_spans()
+    assert span.name == "test GET /items/{id}"
+    assert span.attributes["http.response.status_code"] == 503
+    assert not span.status.is_ok
+
+
+@pytest.mark.asyncio
+async def test_parse_with_llm_span(spans, monkeypatch):
+    """Test parse_with_llm records which parser answered."""
+    from app import actions
+    from app.llm import client as llm_client
+
+    async def mock_chat(*args, **kwargs):
+        raise RuntimeError("LLM API error")
+
+    monkeypatch.setattr(llm_client, "chat", mock_chat)
+    actions._parse_cache.clear()
+
+    await actions.parse_with_llm("clockify.get_user")
+
+    (span,) = spans.get_finished_spans()
+    assert span.name == "parse_with_llm"
+    assert span.attributes["parse.parser"] == "fallback"
+    assert span.attributes["parse.cache_hit"] is False
+
+
+def test_file_exporter_closes_its_file(monkeypatch, tmp_path):
+    """Test the file exporter writes JSON lines and closes the file on shutdown."""
+    path = tmp_path / "spans.jsonl"
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "file")
+    monkeypatch.setattr(settings, "TRACING_FILE_PATH", str(path))
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1.0)
+    created = []
+    create_exporter = tracing._create_exporter
+    monkeypatch.setattr(
+        tracing,
+        "_create_exporter",
+        lambda name: created.append(create_exporter(name)) or created[0],
+    )
+
+    tracing.setup_tracing()
+    with tracing.start_span("written"):
+        pass
+    tracing.shutdown_tracing()
+
+    assert created[0].file.closed
+    assert json.loads(path.read_text(encoding="utf-8"))["name"] == "written"
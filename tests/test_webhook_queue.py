@@ -0,0 +1,66 @@
+"""
+Tests for the webhook ingestion queue.
+"""
+
+import asyncio
+
+import pytest
+
+from app.webhook_queue import WebhookQueue
+
+
+@pytest.mark.asyncio
+async def test_queue_processes_in_background_and_applies_backpressure():
+    """Test events are handled by workers and a full queue rejects new ones."""
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(event):
+        await release.wait()
+        handled.append(event["n"])
+
+    queue = WebhookQueue("test", handler, maxsize=2, workers=1)
+    await queue.start()
+
+    assert await queue.submit({"n": 1})
+    await asyncio.sleep(0)  # worker picks up event 1 and blocks
+    assert await queue.submit({"n": 2})
+    assert await queue.submit({"n": 3})
+    assert not await queue.submit({"n": 4})
+    assert queue.depth() == 2
+
+    release.set()
+    await queue.stop(drain_timeout=1.0)
+    assert handled == [1, 2, 3]
+    assert not queue.running
+
+
+@pytest.mark.asyncio
+async def test_queue_inline_when_not_started():
+    """Test events are processed inline when workers are not running."""
+    handled = []
+
+    async def handler(event):
+        handled.append(event)
+
+    queue = WebhookQueue("test", handler, maxsize=1, workers=2)
+    assert await queue.submit({"n": 1})
+    assert handled == [{"n": 1}]
+
+
+@pytest.mark.asyncio
+async def test_queue_handler_errors_do_not_kill_workers():
+    """Test a failing handler is logged and the worker keeps going."""
+    handled = []
+
+    async def handler(event):
+        if event["n"] == 1:
+            raise RuntimeError("boom")
+        handled.append(event["n"])
+
+    queue = WebhookQueue("test", handler, maxsize=10, workers=1)
+    await queue.start()
+    await queue.submit({"n": 1})
+    await queue.submit({"n": 2})
+    await queue.stop(drain_timeout=1.0)
+    assert handled == [2]
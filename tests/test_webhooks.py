@@ -1,7 +1,9 @@
 """
 Tests for webhook handling and idempotency.
 """
+
 from fastapi.testclient import TestClient
+
 from app.main import app
 
 client = TestClient(app)
@@ -47,6 +49,7 @@ def test_webhook_secret_validation(monkeypatch):
 
     # Reload settings after monkeypatch
     from app.config import settings
+
     settings.WEBHOOK_SHARED_SECRET = "my_secret"
 
     payload = {"id": "entry123"}
@@ -114,3 +117,87 @@ def test_webhook_event_normalization():
     data = response.json()
     assert data["ok"] is True
     assert data["data"]["event"]["eventType"] == "PROJECT"
+
+    # Clockify's event header takes precedence over the payload shape
+    tag_payload = {"id": "tag123", "name": "Urgent", "archived": False, "workspaceId": "ws123"}
+
+    response = client.post(
+        "/webhooks/clockify",
+        json=tag_payload,
+        headers={"Clockify-Webhook-Event-Type": "TAG_UPDATED"},
+    )
+    event = response.json()["data"]["event"]
+    assert event["eventType"] == "TAG"
+    assert event["clockifyEvent"] == "TAG_UPDATED"
+
+
+def test_webhook_invalidates_cached_metadata(monkeypatch):
+    """Test project/client events invalidate cached Clockify metadata."""
+    from app.integrations.base import get_integration
+
+    invalidated = []
+
+    class FakeClient:
+        def invalidate_metadata(self, workspace_id, kind=None):
+            invalidated.append((workspace_id, kind))
+
+    monkeypatch.setattr(get_integration("clockify"), "client", FakeClient())
+
+    client.post(
+        "/webhooks/clockify",
+        json={"id": "proj1", "name": "P", "workspaceId": "ws9", "tasks": []},
+    )
+    client.post(
+        "/webhooks/clockify",
+        json={"id": "c1", "name": "C", "workspaceId": "ws9", "archived": False},
+    )
+
+    assert invalidated == [("ws9", "projects"), ("ws9", "clients")]
+
+
+def test_webhook_queue_full_returns_503(monkeypatch):
+    """Test backpressure: full queue yields 503 and the event is not marked seen."""
+    from app.routes import webhooks_clockify
+
+    async def reject(event):
+        return False
+
+    monkeypatch.setattr(webhooks_clockify.ingest_queue, "submit", reject)
+    payload = {"id": "e1", "userId": "u1", "timeInterval": {"start": "x", "end": "y"}}
+
+    response = client.post(
+        "/webhooks/clockify", json=payload, headers={"X-Clockify-Event-Id": "evt_full"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert response.json()["error"]["code"] == "unavailable"
+
+    monkeypatch.undo()
+    response = client.post(
+        "/webhooks/clockify", json=payload, headers={"X-Clockify-Event-Id": "evt_full"}
+    )
+    assert response.json()["data"]["duplicate"] is False
+
+
+def test_webhook_stage_metrics():
+    """Test per-stage histograms are labelled by event type and duplicates counted."""
+    from prometheus_client import REGISTRY
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, {"service": "clankerbot", **labels}) or 0
+
+    payload = {"id": "c1", "name": "Acme", "archived": False, "workspaceId": "ws1"}
+    stage_labels = {"stage": "normalize", "event_type": "CLIENT"}
+    before_stage = sample("webhook_stage_duration_seconds_count", **stage_labels)
+    before_dupes = sample("webhook_duplicates_total")
+
+    for _ in range(2):
+        response = client.post(
+            "/webhooks/clockify", json=payload, headers={"X-Clockify-Event-Id": "evt_stage_metrics"}
+        )
+        assert response.status_code == 200
+
+    assert sample("webhook_stage_duration_seconds_count", **stage_labels) == before_stage + 2
+    for stage in ("auth", "parse", "idempotency"):
+        assert sample("webhook_stage_duration_seconds_count", stage=stage, event_type="CLIENT") >= 2
+    assert sample("webhook_duplicates_total") == before_dupes + 1